@@ -9,40 +9,65 @@ and features are stored in a database, along with a prediction for each uploaded
 Key Features:
 - User registration and authentication.
 - Image upload and unique filename generation using UUID.
-- Image processing pipeline including RGB to grayscale conversion, segmentation, and feature extraction.
-- Prediction using a pre-trained model.
-- History management to view and delete previous uploads.
+- In-memory image processing pipeline including RGB to grayscale conversion, segmentation, and
+  feature extraction; the processed images are written once at the end.
+- Prediction using a pre-trained model, loaded once per process by a model registry.
+- History management to view and delete previous uploads; the history is paginated with a keyset
+  (date, id) cursor and only loads the columns the list shows.
+- Batch upload: several images of one patient are processed with one model instance, predicted
+  with a single `predict` call on the stacked features and stored in a single transaction.
+- Compact feature storage: each history entry stores its features as a float32 blob; the ordered
+  feature names are stored once per distinct list in the feature_schema table.
+- Result cache: re-uploading identical bytes (same pipeline and model) reuses the stored features,
+  prediction and images instead of processing the image again.
+- Optional background processing: an upload can be queued as a job, processed by a bounded pool
+  of worker processes, and polled through a JSON status endpoint until its history entry exists.
+- Metrics: the duration of every pipeline stage and feature family, the upload sizes and the
+  image dimensions are aggregated per process and served in the Prometheus text format on
+  `/metrics` (with the admin token).
+- Opt-in profiling: a sample of the uploads, or uploads sent with the admin `X-Profile-Token`
+  header, are run under cProfile; the profiles are listed on `/profiles` and by `flask profiles`.
 
 Modules and Libraries Used:
 - Flask: Web framework.
 - Flask_SQLAlchemy: ORM for database operations.
+- models: the database models (Users, History, FeatureSchema, UploadJob), importable on their own.
 - Flask_Login: User session management.
 - Flask_Migrate: Database migration tool.
-- OpenCV (cv2): Image processing.
-- Matplotlib: Image saving for processed results.
-- Pickle: Loading pre-trained models.
+- OpenCV (cv2): Image processing and saving of processed results (via model.pipeline).
+- Pickle: Loading pre-trained models (via model.model_registry).
 - Werkzeuge: Secure file handling.
 - UUID: Unique filename generation.
 - Datetime: Timestamp handling.
 """
 
-from flask import Flask, render_template, request, url_for, redirect, flash
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from flask import (Flask, render_template, request, url_for, redirect, flash, jsonify, abort, Response,
+                   g, send_file)
+from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_migrate import Migrate
 import os
-import cv2
 import sys
 from werkzeug.utils import secure_filename
-from model.rgb_to_gray import rgb_to_gray_converter
-from model.multiotsu_segmentation import multiotsu_masking
-from model.bitwise_operation import get_segmented_image
+from model.pipeline import (decode_image, validate_image, process_image, stack_features, prediction_label, run_upload_job,
+                            artifact_filename, artifact_paths, save_artifacts_async, remove_artifacts,
+                            pipeline_version)
+from model.model_registry import model_registry
+from model.job_queue import JobQueue
 from model.single_image_extractor import SingleImageFeatureExtractor
-import pickle
-from datetime import datetime
+from model.result_cache import ResultCache, upload_cache_key
+from model.feature_storage import encode_features
+from models import db, Users, FeatureSchema, History, UploadJob
+from model.metrics import metrics, StageTimings, record_request, record_stages, CONTENT_TYPE
+from model.profiling import ProfileStore, PROFILE_HEADER, should_profile, start_profiler, upload_metadata
+import click
+import hmac
+from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
-import matplotlib.pyplot as plt
+from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 import uuid
+from functools import partial
 
 # Flask application instance
 app = Flask(__name__)
@@ -52,9 +77,42 @@ app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///db.sqlite"
 app.config["SECRET_KEY"] = "abc"
 app.config['UPLOAD_FOLDER'] = './static/uploads'
 app.config['PROCESSED_FOLDER'] = './static/processed'
-
-# Initialize database and migration tools
-db = SQLAlchemy(app)
+# Reload the model when xgb_best.pkl changes on disk (checked per prediction)
+app.config['MODEL_RELOAD_ON_CHANGE'] = False
+# Queue every upload as a background job (otherwise only when the form asks for it)
+app.config['ASYNC_UPLOADS'] = False
+# Maximum number of uploads processed in the background at the same time
+app.config['JOB_WORKERS'] = 2
+# Run the feature families of one image concurrently: None (serial), 'thread' or 'process'.
+# More workers lower the latency of one request but compete with the other requests.
+app.config['FEATURE_EXECUTOR'] = None
+app.config['FEATURE_WORKERS'] = None
+# Number of pipeline results kept for identical re-uploads (0 disables the cache)
+app.config['RESULT_CACHE_SIZE'] = 256
+# Crop the texture features to the mask's bounding box plus this padding (None = whole image)
+app.config['ROI_PADDING'] = None
+# Extract features from very large images in tiles whose temporary arrays stay
+# under this many MB per feature family (None = whole image at once)
+app.config['FEATURE_MEMORY_BUDGET_MB'] = None
+# Profile a fraction of the uploads (0 to 1) with cProfile when PROFILE_UPLOADS is on
+app.config['PROFILE_UPLOADS'] = False
+app.config['PROFILE_SAMPLE_RATE'] = 0.0
+# Uploads sent with this token in the X-Profile-Token header are always profiled;
+# the profiles and /metrics can only be read with it (None = no token, no /profiles
+# pages and no /metrics)
+app.config['PROFILE_TOKEN'] = None
+app.config['PROFILE_FOLDER'] = './profiles'
+# Number of profiles kept (the oldest are deleted)
+app.config['PROFILE_KEEP'] = 50
+# History entries per page
+app.config['HISTORY_PAGE_SIZE'] = 50
+# Upload jobs shown above the newest entries: queued / running ones, and the
+# ones that failed during the last HISTORY_FAILED_JOBS_HOURS, at most HISTORY_JOBS_SHOWN
+app.config['HISTORY_JOBS_SHOWN'] = 20
+app.config['HISTORY_FAILED_JOBS_HOURS'] = 24
+
+# Initialize database and migration tools (the models are defined in models.py)
+db.init_app(app)
 migrate = Migrate(app, db)
 
 # Flask-Login setup
@@ -68,34 +126,165 @@ login_manager.init_app(app)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['PROCESSED_FOLDER'], exist_ok=True)
 
-# User model
-class Users(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(250), unique=True, nullable=False)
-    password = db.Column(db.String(250), nullable=False)
-
-# History model
-class History(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    name = db.Column(db.String(250), nullable=False)
-    dob = db.Column(db.String(50), nullable=False)
-    original = db.Column(db.String(250), nullable=False)
-    gray = db.Column(db.String(250), nullable=False)
-    mask = db.Column(db.String(250), nullable=False)
-    segmented = db.Column(db.String(250), nullable=False)
-    features = db.Column(db.PickleType, nullable=False)
-    prediction = db.Column(db.String(250), nullable=False)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+# Load the model once at import time (in the gunicorn master with --preload,
+# so forked workers share it) instead of unpickling it on every request
+model_registry.get()
+app.logger.info("Loaded %s in %.3fs", model_registry.path, model_registry.load_seconds)
+record_stages({'model_load': model_registry.load_seconds})
+
+# Worker processes for background uploads (started on first use)
+job_queue = JobQueue(max_workers=app.config['JOB_WORKERS'])
+
+# Results of recent uploads, keyed by file content + pipeline version + model hash
+result_cache = ResultCache(max_entries=app.config['RESULT_CACHE_SIZE'])
+
+# Memory budget of the feature extraction in bytes (None = no tiling)
+feature_memory_budget = (None if app.config['FEATURE_MEMORY_BUDGET_MB'] is None
+                         else int(app.config['FEATURE_MEMORY_BUDGET_MB'] * 2**20))
+
+# Profiles of the sampled / requested uploads
+profile_store = ProfileStore(app.config['PROFILE_FOLDER'], keep=app.config['PROFILE_KEEP'])
+
+# Values read when /metrics is scraped
+metrics.callback_counter('cerviscan_result_cache_hits_total', "Result cache hits since start.",
+                         lambda: result_cache.hits)
+metrics.callback_counter('cerviscan_result_cache_misses_total', "Result cache misses since start.",
+                         lambda: result_cache.misses)
+metrics.gauge('cerviscan_result_cache_entries', "Results currently cached.", lambda: len(result_cache))
+
+# Feature extractor shared by the requests (its pool, if any, is created on first use)
+feature_extractor = SingleImageFeatureExtractor(
+    executor=app.config['FEATURE_EXECUTOR'], max_workers=app.config['FEATURE_WORKERS'],
+    memory_budget=feature_memory_budget,
+)
 
 # Initialize database within the application context
 with app.app_context():
     db.create_all()
 
+# Jobs live in the memory of the process that queued them: rows still queued or
+# running when the server starts were lost by a restart or deploy
+def fail_orphaned_jobs():
+    with app.app_context():
+        orphaned = (UploadJob.query
+                    .filter(UploadJob.status.in_(('queued', 'running')))
+                    .update({'status': 'failed',
+                             'error': "Interrupted by a server restart, please upload the image again."},
+                            synchronize_session=False))
+        db.session.commit()
+    if orphaned:
+        app.logger.warning("Marked %d interrupted upload jobs as failed", orphaned)
+
+# Called once per server start, before any job is accepted: by `python app.py`
+# (at the bottom), `flask run` (here) and the gunicorn master (gunicorn.conf.py).
+# Never on a plain import: job worker processes re-import this module (as
+# __mp_main__ under `python app.py`), and so does every gunicorn worker without
+# --preload, while other jobs are running. The other `flask` commands (db
+# upgrade, profiles ...) run next to a live server and skip it too.
+cli_context = click.get_current_context(silent=True)
+if cli_context is not None and cli_context.info_name == 'run':
+    fail_orphaned_jobs()
+
 @login_manager.user_loader
 def loader_user(user_id):
     return Users.query.get(user_id)
 
+# Id of the FeatureSchema of encoded features (created on first use; ids of
+# committed schemas are remembered, the set of schemas is tiny)
+feature_schema_ids = {}
+
+def feature_schema_id(features):
+    digest = features['digest']
+    if digest in feature_schema_ids:
+        return feature_schema_ids[digest]
+    schema = FeatureSchema.query.filter_by(digest=digest).first()
+    if schema is not None:
+        feature_schema_ids[digest] = schema.id
+        return schema.id
+    try:
+        with db.session.begin_nested():
+            schema = FeatureSchema(digest=digest, names=list(features['names']))
+            db.session.add(schema)
+    except IntegrityError:
+        # Created concurrently by another worker
+        schema = FeatureSchema.query.filter_by(digest=digest).one()
+    return schema.id
+
+# Build a History entry for one processed upload (features from encode_features)
+def new_history(user_id, name, dob, paths, features, prediction, date):
+    return History(
+        user_id=user_id,
+        name=name,
+        dob=dob,
+        original=paths['original'],
+        gray=paths['gray'],
+        mask=paths['mask'],
+        segmented=paths['segmented'],
+        feature_values=features['values'],
+        feature_schema_id=feature_schema_id(features),
+        prediction=prediction,
+        date=date
+    )
+
+# Result cache helpers (a cached result is reused only while its images still exist)
+def cached_result(key):
+    cached = result_cache.get(key)
+    if cached is not None and not all(os.path.exists(path) for path in cached['paths'].values()):
+        result_cache.invalidate(key)
+        return None
+    return cached
+
+def cache_result(key, paths, features, prediction):
+    result_cache.put(key, {'paths': paths, 'features': features, 'prediction': prediction})
+
+# Background job callbacks (run on the job queue's dispatcher threads)
+def mark_job_running(job_id):
+    with app.app_context():
+        job = db.session.get(UploadJob, job_id)
+        job.status = 'running'
+        db.session.commit()
+
+def finish_job(job_id, result, error, cache_key=None, nbytes=None, model_sha256=None):
+    timings = StageTimings()
+    with app.app_context():
+        job = db.session.get(UploadJob, job_id)
+        if error is not None:
+            app.logger.error("Upload job %s failed: %r", job_id, error)
+            job.status = 'failed'
+            job.error = str(error)[:500] or type(error).__name__
+        else:
+            paths = artifact_paths(job.filename, app.config['UPLOAD_FOLDER'], app.config['PROCESSED_FOLDER'])
+            entry = new_history(job.user_id, job.name, job.dob, paths,
+                                result['features'], result['prediction'], job.created)
+            db.session.add(entry)
+            db.session.flush()
+            job.history_id = entry.id
+            job.status = 'done'
+            job.error = None
+            # The key names the web process's model: skip results of another one
+            if cache_key is not None and result['model_sha256'] == model_sha256:
+                cache_result(cache_key, paths, result['features'], result['prediction'])
+            elif cache_key is not None:
+                app.logger.warning("Upload job %s predicted with model %s instead of %s, not cached",
+                                   job_id, result['model_sha256'], model_sha256)
+        with timings.stage('db_commit'):
+            db.session.commit()
+
+    if error is None:
+        # Stages timed in the worker process, plus the commit above
+        record_request({**result['timings'], **timings.seconds}, result['shape'], nbytes,
+                       mode='background', seconds=result['seconds'] + timings.elapsed())
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'status': job.status,
+        'error': job.error,
+        'history_id': job.history_id,
+        'history_url': url_for('history_detail', id=job.history_id) if job.history_id else None,
+        'created': job.created.isoformat(),
+    }
+
 # User registration route
 @app.route('/register', methods=["GET", "POST"])
 def register():
@@ -149,6 +338,13 @@ def logout():
     flash("You have been logged out.", "info")
     return redirect(url_for("login"))
 
+# Response to an upload that is not a readable image (the form is shown again)
+def unsupported_image():
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': "Unsupported image file"}), 400
+    flash("Unsupported image file", "danger")
+    return render_template('index.html', result=None), 400
+
 # Main application route for image processing
 @app.route('/', methods=['GET', 'POST'])
 @login_required
@@ -161,76 +357,286 @@ def index():
         file = request.files['image']
 
         if file:
-            # Generate UUID and use it as the filename
-            unique_filename = f"{uuid.uuid4().hex}{os.path.splitext(file.filename)[1]}"
-            original_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(original_path)
-
-            gray_image = rgb_to_gray_converter(original_path)
-            gray_path = os.path.join(app.config['PROCESSED_FOLDER'], f'gray_{unique_filename}')
-            cv2.imwrite(gray_path, gray_image)
-
-            mask_image = multiotsu_masking(gray_path)
-            mask_path = os.path.join(app.config['PROCESSED_FOLDER'], f'mask_{unique_filename}')
-            plt.imsave(mask_path, mask_image, cmap="gray")
-
-            original_image = cv2.imread(original_path)
-            segmented_image = get_segmented_image(original_image, mask_path)
-            segmented_path = os.path.join(app.config['PROCESSED_FOLDER'], f'segmented_{unique_filename}')
-            cv2.imwrite(segmented_path, segmented_image)
-
-            extractor = SingleImageFeatureExtractor()
-            image_features = extractor.extract_features(segmented_path, color_spaces=['YUV'])
-            drop_cols = [
-                "HGL_deg0", "SRLGLE_deg90", "LRLGLE_deg90", "SRE_deg135", "GLN_deg135",
-                "GLN_deg90", "LGLRE_deg135", "kurtosis_lbp", "LRHGLE_deg45", "RLN_deg90",
-                "LRHGLE_deg135", "GLN_deg0", "LRHGLE_deg90", "LGLRE_deg0", "skew_v",
-                "LRLGLE_deg135", "SRLGLE_deg45", "RLN_deg135", "SRHGLE_deg90",
-                "roughness_tamura", "RP_deg45", "SRHGLE_deg45", "RP_deg0", "RP_deg135",
-                "skewness_lbp", "LRLGLE_deg45", "SRHGLE_deg0", "RP_deg90", "HGL_deg135",
-                "SRHGLE_deg135", "SRLGLE_deg135", "median_lbp", "LGLRE_deg45", "HGL_deg90",
-                "LRLGLE_deg0", "RLN_deg45"
-            ]
-            image_features = image_features.drop(columns=drop_cols, errors="ignore")
-            model = pickle.load(open('./model/xgb_best.pkl', 'rb'))
-            prediction = model.predict(image_features)
-
-            for feature_name, value in image_features.iloc[0].items():
-                print(f"{feature_name} : {value}")
-
-            print(prediction)
-            if prediction[0] == 0:
-                prediction = "normal"
+            timings = StageTimings()
+
+            with timings.stage('read_upload'):
+                original_bytes = file.read()
+
+            # UUID file name, with the extension of the content (not of the client's name)
+            unique_filename = artifact_filename(original_bytes)
+            paths = artifact_paths(unique_filename, app.config['UPLOAD_FOLDER'], app.config['PROCESSED_FOLDER'])
+
+            with timings.stage('model_load'):
+                if app.config['MODEL_RELOAD_ON_CHANGE']:
+                    model_registry.reload_if_changed()
+                loaded = model_registry.snapshot()
+                model = loaded.model
+
+            # Identical bytes, pipeline and model: reuse the stored result
+            with timings.stage('cache_lookup'):
+                cache_key = upload_cache_key(original_bytes, loaded.sha256,
+                                             pipeline_version(app.config['ROI_PADDING']))
+                cached = cached_result(cache_key)
+
+            profiling = cached is None and should_profile(
+                app.config['PROFILE_UPLOADS'], app.config['PROFILE_SAMPLE_RATE'],
+                app.config['PROFILE_TOKEN'], request.headers.get(PROFILE_HEADER))
+
+            # Background mode: return immediately, the job creates the history entry
+            if request.form.get('background') or app.config['ASYNC_UPLOADS']:
+                # Reject unreadable files now rather than as a failed job
+                if cached is None:
+                    try:
+                        validate_image(original_bytes)
+                    except ValueError:
+                        return unsupported_image()
+
+                job = UploadJob(
+                    id=uuid.uuid4().hex,
+                    user_id=current_user.id,
+                    name=f"{first_name} {last_name}",
+                    dob=dob,
+                    filename=unique_filename,
+                    status='queued'
+                )
+                db.session.add(job)
+                if cached is not None:
+                    entry = new_history(current_user.id, job.name, dob, cached['paths'],
+                                        cached['features'], cached['prediction'], datetime.now())
+                    db.session.add(entry)
+                    db.session.flush()
+                    job.history_id = entry.id
+                    job.status = 'done'
+                with timings.stage('db_commit'):
+                    db.session.commit()
+                if cached is None:
+                    # The job's own metrics are recorded by finish_job
+                    record_stages(timings)
+                    # A profiled job is profiled in its worker process
+                    job_queue.submit(job.id, run_upload_job,
+                                     (original_bytes, paths, app.config['ROI_PADDING'], feature_memory_budget,
+                                      app.config['PROFILE_FOLDER'] if profiling else None,
+                                      app.config['PROFILE_KEEP'], loaded.sha256),
+                                     on_start=mark_job_running,
+                                     on_done=partial(finish_job, cache_key=cache_key, nbytes=len(original_bytes),
+                                                     model_sha256=loaded.sha256))
+                else:
+                    record_request(timings, nbytes=len(original_bytes), mode='background', cache='hit')
+
+                if request.accept_mimetypes.best == 'application/json':
+                    response = job_to_dict(job)
+                    response['status_url'] = url_for('job_status', job_id=job.id)
+                    return jsonify(response), 202
+                flash("Image queued for processing. Its status is shown below.", "info")
+                return redirect(url_for('history_page'))
+
+            saving = None
+            image_shape = None
+            if cached is not None:
+                # The history entry references the cached images
+                paths = cached['paths']
+                image_features = cached['features']
+                prediction = cached['prediction']
             else:
-                prediction = "abnormal"
-            print(prediction)
-
-            entry = History(
-                user_id=current_user.id,
-                name=f"{first_name} {last_name}",
-                dob=dob,
-                original=original_path,
-                gray=gray_path,
-                mask=mask_path,
-                segmented=segmented_path,
-                features=image_features,
-                prediction=prediction,
-                date=datetime.now()
-            )
+                if profiling:
+                    # Stopped by save below, or by stop_profiler if the request fails
+                    g.profiler = start_profiler()
+
+                # Gray -> mask -> segmented -> features in memory, extracting only
+                # the features the model was trained on, in its order
+                try:
+                    with timings.stage('decode'):
+                        image = decode_image(original_bytes)
+                except ValueError:
+                    return unsupported_image()
+                image_shape = image.shape
+                processed = process_image(image, feature_names=loaded.feature_names,
+                                          extractor=feature_extractor, roi_padding=app.config['ROI_PADDING'],
+                                          timings=timings)
+
+                # Write the images once, in the background, while predicting and saving
+                saving = save_artifacts_async(processed, paths, original_bytes, timings)
+
+                with timings.stage('predict'):
+                    prediction = prediction_label(model.predict(processed['features'])[0])
+                image_features = encode_features(processed['features'])
+
+            if saving is not None:
+                # The entry links the images: they must be on disk before it is committed
+                with timings.stage('artifact_wait'):
+                    try:
+                        saving.result()
+                    except Exception:
+                        remove_artifacts(paths)
+                        raise
+
+            entry = new_history(current_user.id, f"{first_name} {last_name}", dob, paths,
+                                image_features, prediction, datetime.now())
             db.session.add(entry)
-            db.session.commit()
+            with timings.stage('db_commit'):
+                db.session.commit()
 
+            if saving is not None:
+                cache_result(cache_key, paths, image_features, prediction)
             result = entry
 
-    user_history = History.query.filter_by(user_id=current_user.id).all()
-    return render_template('index.html', result=result, history=user_history)
+            if g.get('profiler') is not None:
+                profile_id = profile_store.save(g.pop('profiler'), upload_metadata(
+                    timings, image_shape, len(original_bytes)))
+                app.logger.info("Upload %s profiled as %s", unique_filename, profile_id)
+
+            record_request(timings, image_shape, len(original_bytes), mode='sync',
+                           cache='miss' if cached is None else 'hit')
+            app.logger.debug("Upload %s: %s in %.3fs", unique_filename, prediction, timings.elapsed())
+
+    return render_template('index.html', result=result)
+
+# Batch route: several images of one patient, one predict call, one transaction
+@app.route('/batch', methods=['GET', 'POST'])
+@login_required
+def batch():
+    results = []
+    skipped = []
+    if request.method == 'POST':
+        first_name = request.form['first_name']
+        last_name = request.form['last_name']
+        dob = request.form['dob']
+        files = [file for file in request.files.getlist('images') if file and file.filename]
+
+        # Stages shared by the whole batch (model, predict, commit)
+        batch_timings = StageTimings()
+        with batch_timings.stage('model_load'):
+            if app.config['MODEL_RELOAD_ON_CHANGE']:
+                model_registry.reload_if_changed()
+            loaded = model_registry.snapshot()
+            model = loaded.model
+
+        uploads = []
+        for file in files:
+            timings = StageTimings()
+            with timings.stage('read_upload'):
+                original_bytes = file.read()
+            with timings.stage('cache_lookup'):
+                cache_key = upload_cache_key(original_bytes, loaded.sha256,
+                                             pipeline_version(app.config['ROI_PADDING']))
+                cached = cached_result(cache_key)
+            if cached is not None:
+                uploads.append({'cache_key': cache_key, 'saving': None, 'timings': timings,
+                                'shape': None, 'nbytes': len(original_bytes), **cached})
+                continue
+
+            try:
+                with timings.stage('decode'):
+                    image = decode_image(original_bytes)
+            except ValueError:
+                skipped.append(file.filename)
+                continue
+            paths = artifact_paths(artifact_filename(original_bytes), app.config['UPLOAD_FOLDER'], app.config['PROCESSED_FOLDER'])
+            processed = process_image(image, feature_names=loaded.feature_names,
+                                      extractor=feature_extractor, roi_padding=app.config['ROI_PADDING'],
+                                      timings=timings)
+            saving = save_artifacts_async(processed, paths, original_bytes, timings)
+            uploads.append({'cache_key': cache_key, 'saving': saving, 'paths': paths, 'timings': timings,
+                            'shape': image.shape, 'nbytes': len(original_bytes),
+                            'features': processed['features'], 'prediction': None})
+
+        # One predict call on the stacked feature matrix of the uncached images
+        missing = [upload for upload in uploads if upload['prediction'] is None]
+        if missing:
+            with batch_timings.stage('predict'):
+                predictions = model.predict(stack_features(missing))
+            for upload, prediction in zip(missing, predictions):
+                upload['prediction'] = prediction_label(prediction)
+                upload['features'] = encode_features(upload['features'])
+
+        if uploads:
+            # The entries link the images: they must be on disk before they are committed
+            saved = [upload for upload in uploads if upload['saving'] is not None]
+            try:
+                for upload in saved:
+                    upload['saving'].result()
+            except Exception:
+                for upload in saved:
+                    upload['saving'].exception()  # Wait for the other writes before deleting
+                    remove_artifacts(upload['paths'])
+                raise
+
+            date = datetime.now()
+            results = [
+                new_history(current_user.id, f"{first_name} {last_name}", dob, upload['paths'],
+                            upload['features'], upload['prediction'], date)
+                for upload in uploads
+            ]
+            db.session.add_all(results)
+            with batch_timings.stage('db_commit'):
+                db.session.commit()
+
+            for upload in uploads:
+                if upload['saving'] is not None:
+                    cache_result(upload['cache_key'], upload['paths'], upload['features'], upload['prediction'])
+                record_request(upload['timings'], upload['shape'], upload['nbytes'], mode='batch',
+                               cache='miss' if upload['saving'] is not None else 'hit')
+        record_stages(batch_timings)
+
+    return render_template('batch.html', results=results, skipped=skipped)
 
 # Route to view user history
 @app.route('/history', methods=['GET'])
 @login_required
 def history_page():
-    user_history = History.query.filter_by(user_id=current_user.id).all()
-    return render_template('history.html', history=user_history)
+    page_size = app.config['HISTORY_PAGE_SIZE']
+    query = (History.query
+             .filter_by(user_id=current_user.id)
+             .options(load_only(History.id, History.name, History.date, History.prediction))
+             .order_by(History.date.desc(), History.id.desc()))
+
+    # Keyset pagination: the entries after the last one of the previous page
+    cursor = request.args.get('before')
+    if cursor:
+        date, entry_id = parse_history_cursor(cursor)
+        query = query.filter(or_(History.date < date, and_(History.date == date, History.id < entry_id)))
+    user_history = query.limit(page_size + 1).all()
+    next_cursor = history_cursor(user_history[page_size - 1]) if len(user_history) > page_size else None
+    user_history = user_history[:page_size]
+
+    total = (db.session.query(func.count(History.id))
+             .filter(History.user_id == current_user.id)
+             .scalar())
+
+    # Pending and recently failed jobs are shown above the newest entries only
+    pending_jobs = []
+    if not cursor:
+        failed_since = datetime.now() - timedelta(hours=app.config['HISTORY_FAILED_JOBS_HOURS'])
+        pending_jobs = (UploadJob.query
+                        .filter(UploadJob.user_id == current_user.id,
+                                or_(UploadJob.status.in_(('queued', 'running')),
+                                    and_(UploadJob.status == 'failed', UploadJob.created >= failed_since)))
+                        .order_by(UploadJob.created.desc())
+                        .limit(app.config['HISTORY_JOBS_SHOWN'])
+                        .all())
+    return render_template('history.html', history=user_history, jobs=pending_jobs, total=total,
+                           next_url=url_for('history_page', before=next_cursor) if next_cursor else None,
+                           first_url=url_for('history_page') if cursor else None)
+
+# History page cursor: date and id of the last entry shown
+def history_cursor(entry):
+    return f"{entry.date.isoformat()}_{entry.id}"
+
+def parse_history_cursor(cursor):
+    try:
+        date, entry_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(date), int(entry_id)
+    except ValueError:
+        abort(400)
+
+# Route to poll the status of a background upload job
+@app.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    job = db.session.get(UploadJob, job_id)
+    if job is None or job.user_id != current_user.id:
+        abort(404)
+    return jsonify(job_to_dict(job))
 
 # Route to view detailed history entry
 @app.route('/history/<int:id>', methods=['GET'])
@@ -255,10 +661,85 @@ def delete_history(id):
     flash("History deleted successfully.", "success")
     return redirect(url_for('history_page'))
 
+# Never leave a profiler running on a server thread (e.g. after an exception)
+@app.teardown_request
+def stop_profiler(exception):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+
+# Token of a profiles / metrics request (kept in the page links); 404 without PROFILE_TOKEN
+# or with a wrong token
+def profile_token():
+    token = request.headers.get(PROFILE_HEADER) or request.args.get('token')
+    if not app.config['PROFILE_TOKEN'] or not hmac.compare_digest(str(app.config['PROFILE_TOKEN']), token or ''):
+        abort(404)
+    return request.args.get('token')
+
+# Most recent upload profiles
+@app.route('/profiles', methods=['GET'])
+@login_required
+def profiles_page():
+    token = profile_token()
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(profile_store.list(limit=request.args.get('limit', 50, type=int)))
+    return render_template('profiles.html', profiles=profile_store.list(), token=token)
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+@login_required
+def profile_download(profile_id):
+    profile_token()
+    path = profile_store.path(profile_id)
+    if path is None:
+        abort(404)
+    return send_file(os.path.abspath(path), mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+@app.route('/profiles/<profile_id>/stats', methods=['GET'])
+@login_required
+def profile_stats(profile_id):
+    profile_token()
+    text = profile_store.stats_text(profile_id, limit=request.args.get('limit', 40, type=int))
+    if text is None:
+        abort(404)
+    return Response(text, content_type='text/plain; charset=utf-8')
+
+# `flask profiles list` / `flask profiles show ID`
+@app.cli.group('profiles')
+def profiles_cli():
+    """List and inspect the stored upload profiles."""
+
+@profiles_cli.command('list')
+@click.option('--limit', default=20, help="Number of profiles listed.")
+def list_profiles(limit):
+    for profile in profile_store.list(limit):
+        click.echo(f"{profile['id']}  {profile['created']}  {profile['mode']:10s} "
+                   f"{profile['width']}x{profile['height']}  {profile['seconds']:.2f}s")
+
+@profiles_cli.command('show')
+@click.argument('profile_id')
+@click.option('--limit', default=30, help="Number of functions listed.")
+@click.option('--sort', default='cumulative', help="pstats sort key (cumulative, tottime, calls, ...).")
+def show_profile(profile_id, limit, sort):
+    text = profile_store.stats_text(profile_id, limit, sort)
+    if text is None:
+        raise click.ClickException(f"No profile {profile_id} in {profile_store.folder}")
+    click.echo(f"Stored in {profile_store.path(profile_id)}")
+    click.echo(text)
+
+# Prometheus scrape endpoint (aggregated stage timings, sizes and counters of this
+# process, see model/metrics.py); same token as the profiles, e.g. `params: {token: [...]}`
+# in the scrape config
+@app.route('/metrics')
+def metrics_page():
+    profile_token()
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 @app.route('/usage')
 @login_required
 def usage():
     return render_template('usage.html')
 
 if __name__ == '__main__':
+    fail_orphaned_jobs()
     app.run()
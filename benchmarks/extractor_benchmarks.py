@@ -0,0 +1,327 @@
+"""
+============================================
+📌 Feature Extractor Micro-Benchmarks (Python)
+============================================
+
+Description:
+------------
+This program times every stage of the CerviScan pipeline on deterministic
+synthetic images, so the effect of a change can be measured and compared
+between runs. A synthetic "VIA photo" is generated for each size: a smooth
+textured, pink-tinted frame with a brighter elliptical lesion region. The
+segmentation stages run on that frame; the feature extractors run on the
+segmented image (lesion kept, background black), like in the web app.
+
+Each benchmark is run a few times and the wall-clock times are reported
+(min / median / mean). The peak memory of one extra run is measured with
+`tracemalloc`, which tracks NumPy and Python allocations (not OpenCV's own
+buffers). The results are written as JSON together with the environment
+(versions, CPU count, git commit), and a previous JSON file can be given to
+print the speed-up of every benchmark.
+
+Features:
+---------
+✅ Deterministic synthetic images at several sizes (default 256², 1024², 3000×2000)
+✅ Times `lbp_implementation`, `coarseness`, `directionality`,
+   `getGrayLevelRumatrix`, the RGB / YUV / LAB color moment extractors,
+   `multiotsu_masking`, `get_segmented_image` and the full `extract_features`
+✅ Peak traced memory per benchmark
+✅ Machine-readable JSON output and comparison with a previous run
+
+Usage:
+------
+1. Run all benchmarks: `python -m benchmarks.extractor_benchmarks`.
+2. Pick sizes / benchmarks / repeats:
+   `python -m benchmarks.extractor_benchmarks --sizes 256x256 1024x1024 --only lbp_implementation coarseness --repeat 5`.
+3. Benchmark `extract_features` in tiled mode: `--memory-budget-mb 64`.
+4. Compare with an earlier run:
+   `python -m benchmarks.extractor_benchmarks --compare benchmarks/results/before.json`.
+
+Example:
+--------
+python -m benchmarks.extractor_benchmarks --sizes 1024x1024 --output /tmp/after.json \
+    --compare /tmp/before.json
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from model.image_context import ImageContext
+from model.rgb_to_gray import rgb_to_gray_converter
+from model.multiotsu_segmentation import multiotsu_masking
+from model.bitwise_operation import get_segmented_image
+from model.lbp_feature_extraction import lbp_implementation
+from model.tamura_feature_extraction import coarseness, directionality
+from model.GrayRumatrix import getGrayRumatrix
+from model.rgb_color_moment import get_rgb_color_moment_features
+from model.yuv_color_moment import get_yuv_color_moment_features
+from model.lab_color_moment import get_lab_color_moment_features
+from model.single_image_extractor import SingleImageFeatureExtractor
+
+# Default image sizes (width x height)
+DEFAULT_SIZES = ['256x256', '1024x1024', '3000x2000']
+
+# Folder of the JSON results when no output file is given
+RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def synthetic_original_image(width, height, seed=0):
+    """
+    Generate a deterministic synthetic VIA-like photo and its lesion mask.
+
+    Parameters
+    ----------
+    width, height : int
+        Image size in pixels.
+    seed : int, optional
+        Seed of the random texture. Default is 0.
+
+    Returns
+    -------
+    image : numpy.ndarray
+        BGR uint8 image.
+    mask : numpy.ndarray
+        uint8 mask of the elliptical lesion region (0 or 255).
+    """
+    rng = np.random.default_rng(seed)
+
+    # Smooth texture at two scales, independent of the image size
+    texture = rng.normal(0, 1, (height, width)).astype(np.float32)
+    fine = cv2.GaussianBlur(texture, (0, 0), 2)
+    coarse = cv2.GaussianBlur(texture, (0, 0), 12)
+    texture = 40 * fine / (fine.std() + 1e-6) + 60 * coarse / (coarse.std() + 1e-6)
+
+    # Brighter elliptical lesion in the middle of a darker tissue background
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(mask, (width // 2, height // 2), (int(width * 0.35), int(height * 0.3)), 15, 0, 360, 255, -1)
+    base = np.where(mask > 0, 170, 90).astype(np.float32)
+    base = cv2.GaussianBlur(base, (0, 0), max(width, height) / 100)
+
+    # Pink tint (BGR)
+    tint = np.array([0.80, 0.65, 1.00], dtype=np.float32)
+    image = np.clip((base + texture)[:, :, None] * tint, 0, 255).astype(np.uint8)
+    return image, mask
+
+
+def parse_size(size):
+    """
+    Parse a size such as '3000x2000' into (width, height).
+    """
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+
+def build_benchmarks(width, height, seed=0, memory_budget=None):
+    """
+    Build the benchmarks of one image size.
+
+    Parameters
+    ----------
+    width, height : int
+        Image size in pixels.
+    seed : int, optional
+        Seed of the synthetic image. Default is 0.
+    memory_budget : int, optional
+        Memory budget of the `extract_features` benchmark (see
+        `SingleImageFeatureExtractor`). Default = no tiling.
+
+    Returns
+    -------
+    dict
+        Benchmark name -> function without arguments running it once.
+    """
+    original, lesion_mask = synthetic_original_image(width, height, seed)
+    gray = rgb_to_gray_converter(original)
+    segmented = get_segmented_image(original, lesion_mask)
+
+    # Decoded once, so the extractors below only time their own work
+    context = ImageContext.from_array(segmented).load()
+    segmented_gray = context.gray
+    pil_gray = context.pil_gray
+    context.rgb
+
+    glrlm = getGrayRumatrix()
+    extractor = SingleImageFeatureExtractor(memory_budget=memory_budget)
+
+    return {
+        'multiotsu_masking': lambda: multiotsu_masking(gray),
+        'get_segmented_image': lambda: get_segmented_image(original, lesion_mask),
+        'lbp_implementation': lambda: lbp_implementation(segmented_gray),
+        'coarseness': lambda: coarseness(segmented_gray, 5),
+        'directionality': lambda: directionality(segmented_gray),
+        'getGrayLevelRumatrix': lambda: glrlm.getGrayLevelRumatrix(pil_gray, ['deg0', 'deg45', 'deg90', 'deg135']),
+        'rgb_color_moment': lambda: get_rgb_color_moment_features(context),
+        'yuv_color_moment': lambda: get_yuv_color_moment_features(context),
+        'lab_color_moment': lambda: get_lab_color_moment_features(context),
+        # Full call from the decoded array: includes the color conversions
+        'extract_features': lambda: extractor.extract_features(ImageContext.from_array(segmented)),
+    }
+
+
+def run_benchmark(function, repeat):
+    """
+    Time a benchmark and measure its peak traced memory.
+
+    Parameters
+    ----------
+    function : callable
+        Benchmark to run (no arguments).
+    repeat : int
+        Number of timed runs.
+
+    Returns
+    -------
+    dict
+        'times_s' of every run, their 'min_s', 'median_s' and 'mean_s',
+        and the 'peak_bytes' traced during one extra run.
+    """
+    function()  # Warm-up (imports, caches, lazy pools)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    # Separate run: tracemalloc slows allocations down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'times_s': times,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'peak_bytes': peak,
+    }
+
+
+def environment():
+    """
+    Describe the machine and code the benchmarks ran on.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(sizes=None, only=None, repeat=3, seed=0, memory_budget=None):
+    """
+    Run the benchmarks for every image size.
+
+    Parameters
+    ----------
+    sizes : list of str, optional
+        Image sizes as 'WIDTHxHEIGHT'. Default = `DEFAULT_SIZES`.
+    only : list of str, optional
+        Names of the benchmarks to run. Default = all.
+    repeat : int, optional
+        Timed runs per benchmark. Default is 3.
+    seed : int, optional
+        Seed of the synthetic images. Default is 0.
+    memory_budget : int, optional
+        Memory budget of the `extract_features` benchmark. Default = no tiling.
+
+    Returns
+    -------
+    dict
+        'environment', 'settings' and the list of 'results' (one per
+        benchmark and size).
+    """
+    sizes = sizes or DEFAULT_SIZES
+    results = []
+    for size in sizes:
+        width, height = parse_size(size)
+        benchmarks = build_benchmarks(width, height, seed, memory_budget)
+        for name, function in benchmarks.items():
+            if only and name not in only:
+                continue
+            result = {'benchmark': name, 'size': f"{width}x{height}", 'pixels': width * height}
+            result.update(run_benchmark(function, repeat))
+            results.append(result)
+            print(f"{name:22s} {result['size']:>10s}  median {result['median_s']:9.4f}s  "
+                  f"min {result['min_s']:9.4f}s  peak {result['peak_bytes'] / 2**20:8.1f} MB", flush=True)
+
+    return {
+        'environment': environment(),
+        'settings': {'sizes': sizes, 'repeat': repeat, 'seed': seed, 'memory_budget': memory_budget},
+        'results': results,
+    }
+
+
+def compare_results(current, previous):
+    """
+    Print the speed-up and memory change of every benchmark in both runs.
+
+    Parameters
+    ----------
+    current, previous : dict
+        Results of `run_benchmarks` (e.g. loaded from JSON files).
+    """
+    before = {(result['benchmark'], result['size']): result for result in previous['results']}
+    print(f"\nCompared with {previous['environment'].get('git_commit')} "
+          f"({previous['environment'].get('timestamp')}):")
+    for result in current['results']:
+        old = before.get((result['benchmark'], result['size']))
+        if old is None:
+            continue
+        speedup = old['median_s'] / result['median_s'] if result['median_s'] else float('inf')
+        memory = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+        print(f"{result['benchmark']:22s} {result['size']:>10s}  {old['median_s']:9.4f}s -> "
+              f"{result['median_s']:9.4f}s  x{speedup:6.2f}  peak memory x{memory:5.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the feature extractors on synthetic images.")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="Image sizes as WIDTHxHEIGHT")
+    parser.add_argument('--only', nargs='+', help="Benchmarks to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic images")
+    parser.add_argument('--memory-budget-mb', type=float,
+                        help="Run extract_features in tiled mode with this budget per family (MB)")
+    parser.add_argument('--output', help="JSON file for the results (default: benchmarks/results/<time>.json)")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    memory_budget = None if args.memory_budget_mb is None else int(args.memory_budget_mb * 2**20)
+    report = run_benchmarks(args.sizes, args.only, args.repeat, args.seed, memory_budget)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(report, json.load(f))
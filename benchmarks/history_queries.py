@@ -0,0 +1,266 @@
+"""
+============================================
+📌 History Query Benchmark (Python)
+============================================
+
+Description:
+------------
+This program measures the database queries behind the history pages with
+and without the indexes of the app's models. A throwaway SQLite database is
+seeded with a realistic volume of data (by default 100,000 history entries
+spread over 100 users, plus upload jobs), then every query is timed twice:
+once with the secondary indexes dropped (the schema before the
+`history_access_indexes` migration) and once with them created. The SQLite
+query plan of every query is printed for both states, so a full table scan
+turning into an index search is visible next to the timings.
+
+The queries are built from the app's models (`models.py`, importable
+without starting the app or touching its database) exactly like the routes
+build them: the first and a deep page of the keyset-paginated history, the
+history count, the pending jobs and the username lookup of the login.
+
+Features:
+---------
+✅ Seeds N history rows / users / jobs into a temporary SQLite file
+✅ Times each query before and after the indexes (median over many users)
+✅ Prints `EXPLAIN QUERY PLAN` for both states
+✅ Optional JSON output
+
+Usage:
+------
+1. Run with the defaults: `python -m benchmarks.history_queries`.
+2. Change the volume: `--rows 200000 --users 50 --jobs 20000`.
+3. Keep the results: `--output /tmp/history_queries.json`.
+
+Example:
+--------
+python -m benchmarks.history_queries --rows 100000 --users 100 --repeat 200
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, func, and_, or_, text
+from sqlalchemy.orm import Session, load_only
+
+from models import db, Users, History, UploadJob, FeatureSchema
+
+# Rows inserted per executemany call while seeding
+SEED_CHUNK = 10000
+
+
+def seed(engine, rows, users, jobs, seed=0):
+    """
+    Fill an empty database with users, history entries and upload jobs.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Database with the app's tables.
+    rows : int
+        Number of history entries (spread evenly over the users).
+    users : int
+        Number of users.
+    jobs : int
+        Number of upload jobs (2% of them still pending).
+    seed : int, optional
+        Seed of the random dates and statuses. Default is 0.
+    """
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    values = bytes(104)  # 26 float32 features
+
+    with engine.begin() as connection:
+        connection.execute(FeatureSchema.__table__.insert(), [{'digest': '0' * 64, 'names': []}])
+        connection.execute(Users.__table__.insert(), [
+            {'id': user_id, 'username': f"clinician{user_id}", 'password': 'x'}
+            for user_id in range(1, users + 1)
+        ])
+
+        batch = []
+        for entry_id in range(1, rows + 1):
+            # Batch uploads share one date: every 5th entry reuses the previous one
+            if entry_id % 5 != 0 or not batch:
+                date = start + timedelta(seconds=rng.randrange(2 * 365 * 86400))
+            batch.append({
+                'id': entry_id, 'user_id': entry_id % users + 1, 'name': f"Patient {entry_id}", 'dob': '1990-01-01',
+                'original': f"./static/uploads/{entry_id}.png", 'gray': f"./static/processed/gray_{entry_id}.png",
+                'mask': f"./static/processed/mask_{entry_id}.png",
+                'segmented': f"./static/processed/segmented_{entry_id}.png",
+                'feature_values': values, 'feature_schema_id': 1,
+                'prediction': rng.choice(['normal', 'abnormal']), 'date': date,
+            })
+            if len(batch) == SEED_CHUNK:
+                connection.execute(History.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(History.__table__.insert(), batch)
+
+        connection.execute(UploadJob.__table__.insert(), [
+            {'id': f"{job_id:032x}", 'user_id': job_id % users + 1, 'name': f"Patient {job_id}", 'dob': '1990-01-01',
+             'filename': f"{job_id}.png", 'status': 'queued' if rng.random() < 0.02 else 'done',
+             'created': start + timedelta(seconds=rng.randrange(2 * 365 * 86400))}
+            for job_id in range(1, jobs + 1)
+        ])
+
+
+def history_page_query(user_id, cursor=None, page_size=50):
+    """Query of one page of `history_page` (see app.py)."""
+    query = (select(History)
+             .where(History.user_id == user_id)
+             .options(load_only(History.id, History.name, History.date, History.prediction))
+             .order_by(History.date.desc(), History.id.desc()))
+    if cursor is not None:
+        date, entry_id = cursor
+        query = query.where(or_(History.date < date, and_(History.date == date, History.id < entry_id)))
+    return query.limit(page_size + 1)
+
+
+def build_queries(session, users):
+    """
+    Build the benchmarked queries.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Session on the seeded database.
+    users : int
+        Number of seeded users.
+
+    Returns
+    -------
+    dict
+        Query name -> function(user_id) returning the statement to run.
+    """
+    # Cursor in the middle of every user's history (a deep page)
+    middles = {}
+    for user_id in range(1, users + 1):
+        dates = session.execute(select(History.date, History.id).where(History.user_id == user_id)
+                                .order_by(History.date.desc(), History.id.desc())).all()
+        middles[user_id] = tuple(dates[len(dates) // 2]) if dates else (datetime.now(), 0)
+
+    # Failed jobs listed on the history page (HISTORY_FAILED_JOBS_HOURS = 24)
+    failed_since = datetime.now() - timedelta(hours=24)
+
+    return {
+        'history_first_page': lambda user_id: history_page_query(user_id),
+        'history_deep_page': lambda user_id: history_page_query(user_id, middles[user_id]),
+        'history_count': lambda user_id: select(func.count(History.id)).where(History.user_id == user_id),
+        'pending_jobs': lambda user_id: (select(UploadJob)
+                                         .where(UploadJob.user_id == user_id,
+                                                or_(UploadJob.status.in_(('queued', 'running')),
+                                                    and_(UploadJob.status == 'failed',
+                                                         UploadJob.created >= failed_since)))
+                                         .order_by(UploadJob.created.desc())
+                                         .limit(20)),
+        'login_lookup': lambda user_id: select(Users).where(Users.username == f"clinician{user_id}").limit(1),
+    }
+
+
+def query_plan(session, statement):
+    """
+    SQLite plan of a statement (one line per step).
+    """
+    compiled = statement.compile(session.get_bind(), compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+def time_queries(session, queries, users, repeat):
+    """
+    Time every query for `repeat` different users.
+
+    Returns
+    -------
+    dict
+        Query name -> {'median_ms', 'mean_ms', 'plan'}.
+    """
+    results = {}
+    for name, build in queries.items():
+        session.execute(build(1)).all()  # Warm-up (page cache)
+        times = []
+        for run in range(repeat):
+            statement = build(run % users + 1)
+            start = time.perf_counter()
+            session.execute(statement).all()
+            times.append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+        results[name] = {'median_ms': statistics.median(times), 'mean_ms': statistics.fmean(times),
+                         'plan': query_plan(session, build(1))}
+    return results
+
+
+def run_benchmark(rows=100000, users=100, jobs=10000, repeat=100, seed_value=0):
+    """
+    Seed a temporary database and time the queries before and after the indexes.
+
+    Returns
+    -------
+    dict
+        'settings', and the 'before' / 'after' results of `time_queries`.
+    """
+    indexes = [index for table in (History.__table__, UploadJob.__table__) for index in table.indexes]
+
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_engine(f"sqlite:///{os.path.join(folder, 'history.sqlite')}")
+        db.metadata.create_all(engine)
+        for index in indexes:
+            index.drop(engine)
+
+        start = time.perf_counter()
+        seed(engine, rows, users, jobs, seed_value)
+        print(f"Seeded {rows} history rows, {users} users, {jobs} jobs in {time.perf_counter() - start:.1f}s")
+
+        report = {'settings': {'rows': rows, 'users': users, 'jobs': jobs, 'repeat': repeat,
+                               'indexes': [index.name for index in indexes]}}
+        with Session(engine) as session:
+            queries = build_queries(session, users)
+            session.execute(text('ANALYZE'))
+            report['before'] = time_queries(session, queries, users, repeat)
+
+            for index in indexes:
+                index.create(engine)
+            session.execute(text('ANALYZE'))
+            report['after'] = time_queries(session, queries, users, repeat)
+        engine.dispose()
+
+    return report
+
+
+def print_report(report):
+    """
+    Print the timings and query plans of both states.
+    """
+    print(f"\n{'query':22s} {'before (ms)':>12s} {'after (ms)':>12s} {'speed-up':>9s}")
+    for name, before in report['before'].items():
+        after = report['after'][name]
+        print(f"{name:22s} {before['median_ms']:12.3f} {after['median_ms']:12.3f} "
+              f"x{before['median_ms'] / after['median_ms']:8.1f}")
+    for name, before in report['before'].items():
+        print(f"\n{name}:\n  before: {'; '.join(before['plan'])}\n  after:  {'; '.join(report['after'][name]['plan'])}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the history queries with and without indexes.")
+    parser.add_argument('--rows', type=int, default=100000, help="History entries to seed")
+    parser.add_argument('--users', type=int, default=100, help="Users owning them")
+    parser.add_argument('--jobs', type=int, default=10000, help="Upload jobs to seed")
+    parser.add_argument('--repeat', type=int, default=100, help="Timed runs per query (different users)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the random data")
+    parser.add_argument('--output', help="JSON file for the results")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.rows, args.users, args.jobs, args.repeat, args.seed)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
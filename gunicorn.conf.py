@@ -0,0 +1,18 @@
+"""
+Documentation for gunicorn.conf.py
+==================================
+
+Gunicorn settings and server hooks, read automatically by `gunicorn` when it is
+started from the project folder (see the Procfile).
+
+Hooks:
+- on_starting: before the master forks its workers, mark the upload jobs that
+  were queued or running when the previous server stopped as failed (they only
+  lived in that server's memory). With --preload the app is already imported;
+  without it, the master imports it here once.
+"""
+
+
+def on_starting(server):
+    from app import fail_orphaned_jobs
+    fail_orphaned_jobs()
@@ -0,0 +1,51 @@
+"""indexes for the history access patterns: history (user_id, date), upload_job (user_id, status)
+
+Revision ID: 1b2647504e04
+Revises: 5f410cd40163
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b2647504e04'
+down_revision = '5f410cd40163'
+branch_labels = None
+depends_on = None
+
+# Table -> (index name, columns); users.username is already indexed by its
+# unique constraint
+INDEXES = {
+    'history': [('ix_history_user_id_date', ['user_id', 'date'])],
+    'upload_job': [('ix_upload_job_user_id_status', ['user_id', 'status'])],
+}
+
+
+def existing_indexes(bind, table):
+    return {index['name'] for index in sa.inspect(bind).get_indexes(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+    for table, indexes in INDEXES.items():
+        if table not in tables:
+            continue  # Created by the app's create_all with its indexes
+        present = existing_indexes(bind, table)
+        for name, columns in indexes:
+            if name not in present:
+                op.create_index(name, table, columns)
+
+
+def downgrade():
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+    for table, indexes in INDEXES.items():
+        if table not in tables:
+            continue
+        present = existing_indexes(bind, table)
+        for name, _ in indexes:
+            if name in present:
+                op.drop_index(name, table_name=table)
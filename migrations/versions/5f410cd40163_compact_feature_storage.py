@@ -0,0 +1,146 @@
+"""compact feature storage: float32 blob + feature_schema instead of pickled DataFrames
+
+Revision ID: 5f410cd40163
+Revises:
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+import pickle
+
+from alembic import op
+import sqlalchemy as sa
+
+from model.feature_storage import encode_features, features_frame
+
+# revision identifiers, used by Alembic.
+revision = '5f410cd40163'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# History rows converted per query (one batch of DataFrames in memory at a time)
+BATCH_SIZE = 500
+
+feature_schema = sa.table(
+    'feature_schema',
+    sa.column('id', sa.Integer),
+    sa.column('digest', sa.String),
+    sa.column('names', sa.JSON),
+)
+
+history = sa.table(
+    'history',
+    sa.column('id', sa.Integer),
+    sa.column('features', sa.LargeBinary),
+    sa.column('feature_values', sa.LargeBinary),
+    sa.column('feature_schema_id', sa.Integer),
+)
+
+
+def history_columns(bind):
+    return {column['name'] for column in sa.inspect(bind).get_columns('history')}
+
+
+def schema_id(bind, stored, schema_ids):
+    # Get or create the feature_schema row of a list of feature names
+    digest = stored['digest']
+    if digest not in schema_ids:
+        found = bind.execute(sa.select(feature_schema.c.id).where(feature_schema.c.digest == digest)).scalar()
+        if found is None:
+            bind.execute(feature_schema.insert().values(digest=digest, names=list(stored['names'])))
+            found = bind.execute(sa.select(feature_schema.c.id).where(feature_schema.c.digest == digest)).scalar()
+        schema_ids[digest] = found
+    return schema_ids[digest]
+
+
+def backfill(bind):
+    # Encode the pickled DataFrames, BATCH_SIZE rows at a time in id order
+    update = (history.update()
+              .where(history.c.id == sa.bindparam('row_id'))
+              .values(feature_values=sa.bindparam('row_values'), feature_schema_id=sa.bindparam('row_schema_id')))
+    schema_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(history.c.id, history.c.features)
+            .where(history.c.id > last_id, history.c.feature_values.is_(None))
+            .order_by(history.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row_id, pickled in rows:
+            stored = encode_features(pickle.loads(pickled))
+            params.append({'row_id': row_id, 'row_values': stored['values'],
+                           'row_schema_id': schema_id(bind, stored, schema_ids)})
+        bind.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # The app's create_all may already have created the new table
+    if 'feature_schema' not in tables:
+        op.create_table(
+            'feature_schema',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('digest', sa.String(length=64), nullable=False),
+            sa.Column('names', sa.JSON(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('digest'),
+        )
+    if 'history' not in tables:
+        return  # Fresh database: create_all builds history with the new columns
+
+    columns = history_columns(bind)
+    if 'feature_values' not in columns:
+        with op.batch_alter_table('history') as batch_op:
+            batch_op.add_column(sa.Column('feature_values', sa.LargeBinary(), nullable=True))
+            batch_op.add_column(sa.Column('feature_schema_id', sa.Integer(), nullable=True))
+
+    if 'features' in columns:
+        backfill(bind)
+        with op.batch_alter_table('history') as batch_op:
+            batch_op.alter_column('feature_values', existing_type=sa.LargeBinary(), nullable=False)
+            batch_op.alter_column('feature_schema_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key('fk_history_feature_schema_id', 'feature_schema',
+                                        ['feature_schema_id'], ['id'])
+            batch_op.drop_column('features')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if 'history' in sa.inspect(bind).get_table_names() and 'features' not in history_columns(bind):
+        with op.batch_alter_table('history') as batch_op:
+            batch_op.add_column(sa.Column('features', sa.LargeBinary(), nullable=True))
+
+        # Pickle the DataFrames again (float32 values), BATCH_SIZE rows at a time
+        update = (history.update()
+                  .where(history.c.id == sa.bindparam('row_id'))
+                  .values(features=sa.bindparam('row_features')))
+        names = dict(bind.execute(sa.select(feature_schema.c.id, feature_schema.c.names)).all())
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(history.c.id, history.c.feature_values, history.c.feature_schema_id)
+                .where(history.c.id > last_id)
+                .order_by(history.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            bind.execute(update, [
+                {'row_id': row_id, 'row_features': pickle.dumps(features_frame(names[schema], values))}
+                for row_id, values, schema in rows
+            ])
+            last_id = rows[-1][0]
+
+        with op.batch_alter_table('history') as batch_op:
+            batch_op.alter_column('features', existing_type=sa.LargeBinary(), nullable=False)
+            batch_op.drop_column('feature_schema_id')
+            batch_op.drop_column('feature_values')
+
+    op.drop_table('feature_schema')
@@ -25,7 +25,7 @@ Features:
 Usage:
 ------
 1. Provide the original image (as a NumPy array, e.g., loaded with OpenCV).  
-2. Provide the path to the mask image (binary or grayscale).  
+2. Provide the path to the mask image (binary or grayscale), or the mask array.  
 3. Call the function `get_segmented_image(original_image, mask_path)`.  
 4. The function returns the segmented output image.  
 
@@ -43,6 +43,7 @@ Author: Fillipus Aditya Nugroho
 """
 
 import cv2
+import numpy as np
 
 def get_segmented_image(original_image, mask_path):
     """
@@ -52,9 +53,9 @@ def get_segmented_image(original_image, mask_path):
     ----------
     original_image : numpy.ndarray
         The original input image (typically loaded using cv2.imread).
-    mask_path : str
-        Path to the mask image (binary or grayscale). The mask will be resized 
-        to match the dimensions of the original image.
+    mask_path : str or numpy.ndarray
+        Path to the mask image (binary or grayscale), or the mask array itself.
+        The mask will be resized to match the dimensions of the original image.
 
     Returns
     -------
@@ -62,7 +63,10 @@ def get_segmented_image(original_image, mask_path):
         The segmented image, where only the masked regions from the original 
         image are retained, and other areas are suppressed.
     """
-    mask_image = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    if isinstance(mask_path, np.ndarray):
+        mask_image = mask_path
+    else:
+        mask_image = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
     
     # Ensure the mask image has the same dimensions as the original image
     mask_image = cv2.resize(mask_image, (original_image.shape[1], original_image.shape[0]))
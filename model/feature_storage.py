@@ -0,0 +1,124 @@
+"""
+============================================
+📌 Compact Feature Storage (Python)
+============================================
+
+Description:
+------------
+This program converts the feature vector of one image between the pandas
+DataFrame returned by the extractors and the compact form stored in the
+database: the values as a little-endian float32 blob (4 bytes per feature,
+104 bytes for the model's 26 features) and the ordered feature names,
+stored once per distinct list in a schema table and referenced by its
+digest. Loading a history entry then no longer unpickles pandas objects;
+the vector or DataFrame is rebuilt only when it is needed.
+
+Features:
+---------
+✅ `encode_features`: one-row DataFrame -> {'names', 'digest', 'values'}
+✅ `decode_vector` / `features_frame`: blob (+ names) -> array / DataFrame
+✅ `schema_digest`: stable SHA-256 of an ordered list of feature names
+
+Usage:
+------
+1. Encode the extracted features: `stored = encode_features(processed['features'])`.
+2. Store `stored['values']` with a reference to the schema of
+   `stored['names']` (looked up by `stored['digest']`).
+3. Rebuild them: `features_frame(names, blob)`.
+
+Example:
+--------
+stored = encode_features(features)
+frame = features_frame(stored['names'], stored['values'])
+print(frame.columns.tolist() == list(features.columns))
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# Stored dtype: little-endian float32 (the model computes in float32 too)
+FEATURE_DTYPE = np.dtype('<f4')
+
+
+def schema_digest(names):
+    """
+    SHA-256 of an ordered list of feature names.
+
+    Parameters
+    ----------
+    names : list of str
+        Feature names, in column order.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the schema.
+    """
+    return hashlib.sha256(json.dumps(list(names)).encode('utf-8')).hexdigest()
+
+
+def encode_features(features):
+    """
+    Convert the features of one image to their stored form.
+
+    Parameters
+    ----------
+    features : pd.DataFrame
+        One-row DataFrame of features.
+
+    Returns
+    -------
+    dict
+        'names' (tuple of column names), 'digest' (`schema_digest` of the
+        names) and 'values' (float32 bytes, one value per name).
+    """
+    if len(features) != 1:
+        raise ValueError(f"Expected the features of one image, got {len(features)} rows")
+    names = tuple(str(name) for name in features.columns)
+    values = features.to_numpy(dtype=np.float64)[0].astype(FEATURE_DTYPE)
+    return {'names': names, 'digest': schema_digest(names), 'values': values.tobytes()}
+
+
+def decode_vector(values):
+    """
+    Rebuild the feature vector from its stored bytes.
+
+    Parameters
+    ----------
+    values : bytes
+        Stored float32 values.
+
+    Returns
+    -------
+    numpy.ndarray
+        1-D float32 array (read-only view of the bytes).
+    """
+    return np.frombuffer(values, dtype=FEATURE_DTYPE)
+
+
+def features_frame(names, values):
+    """
+    Rebuild the one-row DataFrame of features.
+
+    Parameters
+    ----------
+    names : list of str
+        Feature names of the schema.
+    values : bytes
+        Stored float32 values.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row, one float32 column per feature name.
+    """
+    vector = decode_vector(values)
+    if len(vector) != len(names):
+        raise ValueError(f"{len(vector)} stored values for a schema of {len(names)} features")
+    return pd.DataFrame([vector], columns=list(names))
@@ -23,9 +23,9 @@ Features:
 
 Usage:
 ------
-1. Provide the path to the input image.
+1. Provide the path to the input image (or an ImageContext).
 2. Optionally enable Local Binary Pattern (LBP) preprocessing by setting `lbp='on'`.
-3. Call `get_glrlm_features(path)` to extract GLRLM features.
+3. Call `get_glrlm_features(image)` to extract GLRLM features.
 4. Use `get_glrlm_feature_names()` to get the corresponding feature names.
 
 Example:
@@ -44,90 +44,66 @@ Author: Fillipus Aditya Nugroho
 import numpy as np
 import warnings
 from model.GrayRumatrix import getGrayRumatrix
+from model.image_context import as_image_context
 
 # Suppress warnings to keep output clean
 warnings.filterwarnings("ignore")
 
-def get_glrlm_features(path, lbp='off'):
+# Temporary bytes per pixel of a chunk in tiled mode (sequence copy, run
+# boundaries, lengths, levels and the bincount index; row/column indices
+# for the diagonal bands)
+GLRLM_BYTES_PER_PIXEL = 64
+
+def get_glrlm_features(image, lbp='off', features=None, memory_budget=None):
     """
     Calculate GLRLM (Gray Level Run Length Matrix) features for a given image.
 
     Parameters
     ----------
-    path : str
-        Path to the input image.
+    image : str, np.ndarray or ImageContext
+        Path to the input image, an already-decoded BGR array, or a shared
+        image context.
     lbp : str, optional
         If 'on', apply Local Binary Pattern (LBP) transformation before computing GLRLM.
         Defaults to 'off'.
+    features : list of str, optional
+        Subset of `get_glrlm_feature_names()` to compute, in the desired
+        order. Only the directions they refer to are built. Default = all.
+    memory_budget : int, optional
+        If given, the runs are counted in chunks of whole rows, columns or
+        diagonals whose temporary arrays stay below this many bytes, and
+        the counts are added (same results). The GLRLM itself is not
+        chunked. Default = every direction at once.
 
     Returns
     -------
     list
         List of extracted GLRLM feature values for each specified direction.
     """
+    if features is None:
+        features = get_glrlm_feature_names()
 
     # Initialize GLRLM processing object
     test = getGrayRumatrix()
 
-    # Read and preprocess image (optionally apply LBP)
-    test.read_img(path, lbp)
-
-    # Define directions for which GLRLM will be computed
-    DEG = [['deg0'], ['deg45'], ['deg90'], ['deg135']]
-
-    glrlm_features_value = []
-
-    # Loop through each direction to compute features
-    for deg in DEG:
-        # Compute GLRLM matrix for the current direction
-        test_data = test.getGrayLevelRumatrix(test.data, deg)
-
-        # Calculate various statistical measures from GLRLM
-        SRE = test.getShortRunEmphasis(test_data)  # Short Run Emphasis
-        SRE = float(np.squeeze(SRE))
-        
-        LRE = test.getLongRunEmphasis(test_data)   # Long Run Emphasis
-        LRE = float(np.squeeze(LRE))
-        
-        GLN = test.getGrayLevelNonUniformity(test_data)  # Gray Level Non-Uniformity
-        GLN = float(np.squeeze(GLN))
-        
-        RLN = test.getRunLengthNonUniformity(test_data)  # Run Length Non-Uniformity
-        RLN = float(np.squeeze(RLN))
-
-        RP = test.getRunPercentage(test_data)  # Run Percentage
-        RP = float(np.squeeze(RP))
-        
-        LGLRE = test.getLowGrayLevelRunEmphasis(test_data)  # Low Gray Level Run Emphasis
-        LGLRE = float(np.squeeze(LGLRE))
-        
-        HGL = test.getHighGrayLevelRunEmphais(test_data)  # High Gray Level Run Emphasis
-        HGL = float(np.squeeze(HGL))
-        
-        SRLGLE = test.getShortRunLowGrayLevelEmphasis(test_data)  # Short Run Low Gray Level Emphasis
-        SRLGLE = float(np.squeeze(SRLGLE))
-        
-        SRHGLE = test.getShortRunHighGrayLevelEmphasis(test_data)  # Short Run High Gray Level Emphasis
-        SRHGLE = float(np.squeeze(SRHGLE))
-        
-        LRLGLE = test.getLongRunLow(test_data)  # Long Run Low Gray Level Emphasis
-        LRLGLE = float(np.squeeze(LRLGLE))
-        
-        LRHGLE = test.getLongRunHighGrayLevelEmphais(test_data)  # Long Run High Gray Level Emphasis
-        LRHGLE = float(np.squeeze(LRHGLE))
-
-        # Combine all features for the current direction
-        glrlm_features_value_per_deg = [
-            SRE, LRE, GLN, RLN, RP,
-            LGLRE, HGL, SRLGLE, SRHGLE, LRLGLE, LRHGLE
-        ]
-        
-        # Append features to the overall result list
-        for value in glrlm_features_value_per_deg:
-            glrlm_features_value.append(value)
-
-    # Return final list of GLRLM feature values for all directions
-    return glrlm_features_value
+    # Grayscale image (Pillow 'L' conversion, as used by `read_img`)
+    test.data = as_image_context(image).pil_gray
+
+    # Define directions for which GLRLM will be computed (only those requested)
+    requested_degs = {name.rsplit('_', 1)[1] for name in features}
+    DEG = [deg for deg in ['deg0', 'deg45', 'deg90', 'deg135'] if deg in requested_degs]
+
+    # Compute the GLRLM matrix for all directions in one call
+    chunk_pixels = None if memory_budget is None else max(1, memory_budget // GLRLM_BYTES_PER_PIXEL)
+    glrlm = test.getGrayLevelRumatrix(test.data, DEG, chunk_pixels)
+
+    # Calculate the 11 statistical measures (SRE, LRE, GLN, RLN, RP, LGLRE,
+    # HGL, SRLGLE, SRHGLE, LRLGLE, LRHGLE) for every direction in one pass
+    names = get_glrlm_names(getGrayRumatrix.FEATURE_NAMES, [[deg] for deg in DEG])
+    values = dict(zip(names, test.getFeatureVector(glrlm).tolist()))
+
+    # Return final list of GLRLM feature values in the requested order
+    return [values[name] for name in features]
 
 def get_glrlm_names(features, degs):
     """
@@ -163,9 +139,6 @@ def get_glrlm_feature_names():
     list
         Full list of GLRLM feature names with directional labels.
     """
-    glrlm_features = [
-        'SRE', 'LRE', 'GLN', 'RLN', 'RP',
-        'LGLRE', 'HGL', 'SRLGLE', 'SRHGLE', 'LRLGLE', 'LRHGLE'
-    ]
+    glrlm_features = getGrayRumatrix.FEATURE_NAMES
     glrlm_degs = [['deg0'], ['deg45'], ['deg90'], ['deg135']]
     return get_glrlm_names(glrlm_features, glrlm_degs)
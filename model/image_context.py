@@ -0,0 +1,167 @@
+"""
+============================================
+📌 Shared Image Context for Feature Extraction (Python)
+============================================
+
+Description:
+------------
+This program provides an `ImageContext` object that decodes an image once
+and lazily caches the array representations needed by the different feature
+extractors (BGR, RGB and grayscale). Every `get_*_features` function accepts
+an `ImageContext` in place of an image path, so a full extraction performs a
+single disk read and each color conversion at most once.
+
+Features:
+---------
+✅ Decodes the image from disk only once (with OpenCV)
+✅ Lazily caches BGR, RGB and grayscale arrays on first use
+✅ Can wrap an already-decoded array (no disk access at all)
+✅ `as_image_context()` accepts a path, an array or an existing context
+
+Usage:
+------
+1. Create a context from a path: `context = ImageContext.from_path(path)`,
+   or from an array: `context = ImageContext.from_array(bgr_image)`.
+2. Pass the context to any `get_*_features` function instead of a path.
+3. Inside extractors, call `as_image_context(image)` to accept all inputs.
+
+Example:
+--------
+from model.image_context import ImageContext
+from model.lbp_feature_extraction import get_lbp_features
+from model.tamura_feature_extraction import get_tamura_features
+
+context = ImageContext.from_path("segmented_image.png")
+features = get_lbp_features(context) + get_tamura_features(context)
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class ImageContext:
+    """
+    Decode-once container for the arrays used by the feature extractors.
+    """
+
+    def __init__(self, path=None, bgr=None, gray=None):
+        """
+        Create a context from a path, a BGR array or a grayscale array.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the image file. Decoded on first access.
+        bgr : numpy.ndarray, optional
+            Already-decoded 3-channel image in BGR order (as from `cv2.imread`).
+        gray : numpy.ndarray, optional
+            Already-decoded 2D grayscale image.
+        """
+        if path is None and bgr is None and gray is None:
+            raise ValueError("ImageContext needs a path, a BGR array or a grayscale array.")
+        self.path = path
+        self._bgr = bgr
+        self._rgb = None
+        self._gray = gray
+        self._pil_gray = gray
+
+    @classmethod
+    def from_path(cls, path):
+        """Create a context that decodes `path` on first use."""
+        return cls(path=path)
+
+    @classmethod
+    def from_array(cls, image):
+        """Create a context from a 2D grayscale or 3D BGR array."""
+        if image.ndim == 2:
+            return cls(gray=image)
+        return cls(bgr=image)
+
+    def load(self):
+        """
+        Decode the image now if the context was created from a path.
+
+        Useful before sharing a context with worker threads or processes, so
+        the file is read once instead of once per worker.
+
+        Returns
+        -------
+        ImageContext
+            The context itself.
+        """
+        if self._bgr is None and self._gray is None:
+            self.bgr
+        return self
+
+    @property
+    def bgr(self):
+        """3-channel image in BGR order."""
+        if self._bgr is None:
+            if self.path is not None:
+                self._bgr = cv2.imread(self.path, cv2.IMREAD_COLOR)
+                if self._bgr is None:
+                    raise ValueError(f"Could not read image at {self.path}.")
+            else:
+                self._bgr = cv2.cvtColor(self._gray, cv2.COLOR_GRAY2BGR)
+        return self._bgr
+
+    @property
+    def rgb(self):
+        """3-channel image in RGB order."""
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self):
+        """Grayscale image from OpenCV's BGR to gray conversion (LBP, Tamura)."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def pil_gray(self):
+        """
+        Grayscale image from Pillow's 'L' conversion (GLRLM).
+
+        Pillow rounds the ITU-R 601-2 luma differently from OpenCV, so some
+        pixels differ by 1 from `gray`. GLRLM features were trained on this
+        conversion, so it is kept separately.
+        """
+        if self._pil_gray is None:
+            self._pil_gray = np.array(Image.fromarray(self.rgb).convert('L'))
+        return self._pil_gray
+
+    @property
+    def shape(self):
+        """Image height and width."""
+        if self._gray is not None:
+            return self._gray.shape[:2]
+        return self.bgr.shape[:2]
+
+
+def as_image_context(image):
+    """
+    Get an `ImageContext` for an image path, an array or an existing context.
+
+    Parameters
+    ----------
+    image : str, os.PathLike, numpy.ndarray or ImageContext
+        Image path, decoded 2D grayscale / 3D BGR array, or context.
+
+    Returns
+    -------
+    ImageContext
+        The given context, or a new one wrapping the input.
+    """
+    if isinstance(image, ImageContext):
+        return image
+    if isinstance(image, np.ndarray):
+        return ImageContext.from_array(image)
+    return ImageContext.from_path(os.fspath(image))
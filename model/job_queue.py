@@ -0,0 +1,166 @@
+"""
+============================================
+📌 Background Job Queue for Uploads (Python)
+============================================
+
+Description:
+------------
+This program runs long image-processing jobs outside of the web request.
+A bounded pool of worker processes executes the jobs, while a matching pool
+of lightweight dispatcher threads reports each job's progress (started /
+finished / failed) through callbacks, e.g. to update a status row in the
+database.
+
+Worker processes are started with the 'spawn' method: forking a web worker
+that already ran OpenMP-based predictions (XGBoost) can deadlock the child.
+Both pools are created lazily, so importing this module in a preloading
+gunicorn master does not start any thread or process.
+
+Features:
+---------
+✅ Bounded number of concurrently running jobs
+✅ CPU-heavy work runs in separate processes (no GIL contention with requests)
+✅ `on_start` / `on_done` callbacks for status tracking
+✅ Recovers from a crashed worker process by recreating the pool
+✅ A failing callback is logged; if `on_done` fails on a successful job it is
+   called again with that exception, so the job can still be marked failed
+
+Usage:
+------
+1. Create a queue: `queue = JobQueue(max_workers=2)`.
+2. Submit a picklable, module-level function with its arguments:
+   `queue.submit(job_id, fn, args, on_start=..., on_done=...)`.
+3. `on_done(job_id, result, error)` receives the result or the exception.
+
+Example:
+--------
+def started(job_id):
+    print(job_id, "running")
+
+def finished(job_id, result, error):
+    print(job_id, "failed" if error else "done", result)
+
+queue = JobQueue(max_workers=2)
+queue.submit("job-1", pow, (2, 10), on_start=started, on_done=finished)
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Runs submitted functions in a bounded pool of worker processes.
+    """
+
+    def __init__(self, max_workers=2, start_method='spawn'):
+        """
+        Create a queue (no thread or process is started yet).
+
+        Parameters
+        ----------
+        max_workers : int
+            Maximum number of jobs running at the same time.
+        start_method : str
+            Multiprocessing start method of the worker processes.
+        """
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self.dispatcher = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-dispatcher")
+        self._processes = None
+        self._lock = threading.Lock()
+
+    def _get_processes(self):
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            return self._processes
+
+    def _reset_processes(self, broken):
+        with self._lock:
+            if self._processes is broken:
+                self._processes = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, job_id, fn, args=(), on_start=None, on_done=None):
+        """
+        Queue a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Identifier passed back to the callbacks.
+        fn : callable
+            Module-level (picklable) function run in a worker process.
+        args : tuple
+            Positional arguments for `fn` (must be picklable).
+        on_start : callable, optional
+            Called as `on_start(job_id)` when the job starts.
+        on_done : callable, optional
+            Called as `on_done(job_id, result, error)` when the job ends;
+            `error` is None on success, otherwise the raised exception.
+            If it raises while handling a success, it is called once more
+            with that exception as `error` (and `result` None).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Completes after `on_done` has run.
+        """
+        return self.dispatcher.submit(self._run, job_id, fn, args, on_start, on_done)
+
+    def _run(self, job_id, fn, args, on_start, on_done):
+        if on_start is not None:
+            try:
+                on_start(job_id)
+            except Exception:
+                logger.exception("on_start of job %s failed", job_id)
+
+        result, error = None, None
+        processes = self._get_processes()
+        try:
+            result = processes.submit(fn, *args).result()
+        except BrokenProcessPool as e:
+            self._reset_processes(processes)
+            error = e
+        except Exception as e:
+            error = e
+
+        if on_done is not None:
+            try:
+                on_done(job_id, result, error)
+            except Exception as e:
+                logger.exception("on_done of job %s failed", job_id)
+                if error is None:
+                    # E.g. storing the result failed: report the job as failed instead
+                    try:
+                        on_done(job_id, None, e)
+                    except Exception:
+                        logger.exception("on_done of job %s failed again", job_id)
+        return result
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting jobs and shut both pools down.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for the running jobs to finish.
+        """
+        self.dispatcher.shutdown(wait=wait)
+        with self._lock:
+            processes, self._processes = self._processes, None
+        if processes is not None:
+            processes.shutdown(wait=wait)
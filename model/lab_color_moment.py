@@ -14,7 +14,11 @@ classification, and object recognition.
 Features:
 ---------
 ✅ Converts images to LAB color space using scikit-image
+✅ Works on the decoded array directly, with an optional 8-bit lookup table
+   (used by `SingleImageFeatureExtractor`; same values as the plain conversion)
 ✅ Computes mean, standard deviation, and skewness for each LAB channel
+✅ Optional tiled mode: converts row stripes under a memory budget and merges
+   their moments (same values up to floating-point rounding)
 ✅ Returns features as a list for easy integration with ML pipelines
 ✅ Includes a helper function to provide descriptive feature names
 
@@ -24,6 +28,9 @@ Usage:
 2. The function will return a list of 9 extracted features.
 3. Use `get_lab_color_moment_feature_names()` to get the ordered names 
    corresponding to the extracted features.
+4. Run `python -m model.lab_color_moment image.png ...` to check the
+   lookup-table path against the plain skimage conversion on your own
+   images (`tests/test_lab_color_moment.py` checks it on synthetic ones).
 
 Example:
 --------
@@ -38,62 +45,129 @@ Author: Fillipus Aditya Nugroho
 
 import numpy as np
 import skimage
-import cv2
-from scipy.stats import skew
+from skimage.color.colorconv import xyz_from_rgb
+from model.moment_statistics import channel_moments, tiled_channel_moments
+from model.image_context import as_image_context
 
 
-def get_lab_color_moment_features(image_path):
+def build_srgb_linear_lut():
     """
-    Extract color moment features from an image in the LAB color space.
+    Build the lookup table mapping 8-bit sRGB values to linear RGB.
+
+    Applies the same gamma expansion as `skimage.color.rgb2xyz` to the
+    256 possible values of an 8-bit channel.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of 256 float64 linear RGB values.
+    """
+    lut = np.arange(256) / 255
+    mask = lut > 0.04045
+    lut[mask] = np.power((lut[mask] + 0.055) / 1.055, 2.4)
+    lut[~mask] /= 12.92
+    return lut
+
+
+# Precomputed 8-bit sRGB -> linear RGB table used by `rgb_to_lab(..., use_lut=True)`
+SRGB_LINEAR_LUT = build_srgb_linear_lut()
+
+# Temporary bytes per pixel of a stripe in tiled mode (the float64 RGB, XYZ
+# and LAB images of skimage's conversion plus the moment computation)
+LAB_BYTES_PER_PIXEL = 160
+
+
+def rgb_to_lab(rgb_image, use_lut=False):
+    """
+    Convert an RGB image array to the LAB color space.
 
     Parameters
     ----------
-    image_path : str
-        Path to the image file to be analyzed.
+    rgb_image : numpy.ndarray
+        RGB image with shape (height, width, 3).
+    use_lut : bool, optional
+        For 8-bit input, read the sRGB gamma expansion from a precomputed
+        256-entry table instead of evaluating `np.power` per pixel.
+        Default is False.
 
     Returns
     -------
-    list
-        A list of 9 extracted statistical features in the following order:
-        - Mean (L, A, B channels)
-        - Standard deviation (L, A, B channels)
-        - Skewness (L, A, B channels)
+    numpy.ndarray
+        LAB image with shape (height, width, 3).
     """
-    # Read the image from file (BGR format by default in OpenCV)
-    image = cv2.imread(image_path)
-    
-    # Convert BGR to RGB for correct color conversion
-    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    
-    # Convert the RGB image to a numpy array
-    image_array = np.array(rgb_image)
-    
+    if use_lut and rgb_image.dtype == np.uint8:
+        linear_rgb = SRGB_LINEAR_LUT[rgb_image]
+        xyz = linear_rgb @ xyz_from_rgb.T
+        return skimage.color.xyz2lab(xyz)
+
     # Normalize RGB values to [0, 1] for skimage compatibility
-    rgb_img_normalized = [
-        [[element / 255 for element in sublist] for sublist in inner_list]
-        for inner_list in image_array
-    ]
-    
+    rgb_img_normalized = rgb_image / 255
+
     # Convert normalized RGB image to LAB color space using skimage
-    lab_image = skimage.color.rgb2lab(rgb_img_normalized)
+    return skimage.color.rgb2lab(rgb_img_normalized)
 
-    # Calculate mean for each LAB channel
-    mean_l = np.mean(lab_image[:, :, 0])
-    mean_a = np.mean(lab_image[:, :, 1])
-    mean_b = np.mean(lab_image[:, :, 2])
 
-    # Calculate standard deviation for each LAB channel
-    std_l = np.std(lab_image[:, :, 0])
-    std_a = np.std(lab_image[:, :, 1])
-    std_b = np.std(lab_image[:, :, 2])
+def get_lab_color_moment_features(image, use_lut=False, features=None, memory_budget=None):
+    """
+    Extract color moment features from an image in the LAB color space.
 
-    # Calculate skewness for each LAB channel
-    skew_l = skew(lab_image[:, :, 0].flatten())
-    skew_a = skew(lab_image[:, :, 1].flatten())
-    skew_b = skew(lab_image[:, :, 2].flatten())
+    Parameters
+    ----------
+    image : str, numpy.ndarray or ImageContext
+        Path to the input image, an already-decoded BGR array, or a shared
+        image context.
+    use_lut : bool, optional
+        Use the precomputed 8-bit sRGB lookup table for the conversion
+        (see `rgb_to_lab`). Default is False.
+    features : list of str, optional
+        Subset of `get_lab_color_moment_feature_names()` to compute, in the
+        desired order. Default = all features.
+    memory_budget : int, optional
+        If given, the image is converted in row stripes whose temporary
+        arrays stay below this many bytes, and the moments of the stripes
+        are merged. Default = whole image at once.
 
-    # Return list of all extracted color moment features
-    return [mean_l, mean_a, mean_b, std_l, std_a, std_b, skew_l, skew_a, skew_b]
+    Returns
+    -------
+    list
+        A list of 9 extracted statistical features in the following order:
+        - Mean (L, A, B channels)
+        - Standard deviation (L, A, B channels)
+        - Skewness (L, A, B channels)
+    """
+    # Decoded RGB image array
+    rgb_image = as_image_context(image).rgb
+
+    if features is None:
+        features = get_lab_color_moment_feature_names()
+
+    if memory_budget is not None:
+        requested = {name.split('_')[1] for name in features}
+        moments = tiled_channel_moments(
+            rgb_image, {channel: 'lab'.index(channel) for channel in requested},
+            LAB_BYTES_PER_PIXEL, memory_budget,
+            convert=lambda tile: rgb_to_lab(tile, use_lut),
+        )
+        return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
+
+    # Convert the RGB image to LAB color space
+    lab_image = rgb_to_lab(rgb_image, use_lut)
+
+    # Color moments per channel, computed only for the requested features
+    channels = {
+        'l': lab_image[:, :, 0],
+        'a': lab_image[:, :, 1],
+        'b': lab_image[:, :, 2],
+    }
+    moments = {}
+    for name in features:
+        channel = name.split('_')[1]
+        if channel not in moments:
+            # Mean, standard deviation and skewness from one pass over the channel
+            moments[channel] = channel_moments(channels[channel])
+
+    # Return the features in the requested order
+    return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
 
 
 def get_lab_color_moment_feature_names():
@@ -113,3 +187,16 @@ def get_lab_color_moment_feature_names():
         'std_l', 'std_a', 'std_b',      # Standard deviations for L, A, B channels
         'skew_l', 'skew_a', 'skew_b'    # Skewness for L, A, B channels
     ]
+
+
+if __name__ == "__main__":
+    # Accuracy check: compare the lookup-table path against the plain
+    # skimage conversion for the images given on the command line.
+    import sys
+
+    for path in sys.argv[1:]:
+        rgb = as_image_context(path).rgb
+        pixel_error = np.max(np.abs(rgb_to_lab(rgb, use_lut=True) - rgb_to_lab(rgb)))
+        reference = np.array(get_lab_color_moment_features(path))
+        feature_error = np.max(np.abs(np.array(get_lab_color_moment_features(path, use_lut=True)) - reference))
+        print(f"{path}: max pixel error {pixel_error:.3e}, max feature error {feature_error:.3e}")
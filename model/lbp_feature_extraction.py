@@ -23,12 +23,17 @@ Features:
    - Skewness
 ✅ Returns both feature values and feature names for integration 
    with machine learning pipelines
+✅ Vectorized LBP engine: the whole image is encoded with shifted-neighbour
+   comparisons instead of a per-pixel Python loop
+✅ Accepts an image path, an already-decoded image array or an ImageContext
+✅ Optional tiled mode: LBP codes computed per row stripe (with a one-row
+   halo) under a memory budget, histograms merged (identical results)
 
 Usage:
 ------
-1. Provide an image path to `get_lbp_features(path)` to extract 
-   statistical features.
-2. Use `lbp_implementation(path)` to obtain the LBP-transformed image.
+1. Provide an image path (or a decoded array / ImageContext) to 
+   `get_lbp_features(image)` to extract statistical features.
+2. Use `lbp_implementation(image)` to obtain the LBP-transformed image.
 3. Call `get_lbp_feature_names()` to retrieve feature names.
 
 Example:
@@ -43,7 +48,13 @@ Author: Fillipus Aditya Nugroho
 """
 
 import numpy as np
-import cv2
+from model.image_context import as_image_context
+from model.moment_statistics import channel_moments, MomentAccumulator
+from model.tiling import row_tiles
+
+# Temporary bytes per pixel of a stripe in tiled mode (padded int16 copy,
+# comparison planes, codes and the bincount input)
+LBP_BYTES_PER_PIXEL = 16
 
 
 def get_pixel(img, center, x, y):
@@ -113,70 +124,145 @@ def lbp_calculated_pixel(img, x, y):
     return sum(val_ar[i] * power_val[i] for i in range(8))
 
 
-def lbp_implementation(path):
+# Neighbour offsets (row, column) in the same bit order as `lbp_calculated_pixel`
+NEIGHBOUR_OFFSETS = [
+    (-1, -1),  # top-left
+    (-1, 0),   # top
+    (-1, 1),   # top-right
+    (0, 1),    # right
+    (1, 1),    # bottom-right
+    (1, 0),    # bottom
+    (1, -1),   # bottom-left
+    (0, -1)    # left
+]
+
+
+def lbp_transform(img_gray, start=0, stop=None):
     """
-    Apply Local Binary Pattern (LBP) transformation on an image.
+    Compute the LBP image of a grayscale array with whole-array operations.
+
+    Produces exactly the same codes as calling `lbp_calculated_pixel` for
+    every pixel, including its border semantics: a neighbour index of -1
+    wraps around to the last row/column (Python negative indexing), while a
+    neighbour index past the last row/column counts as 0.
 
     Parameters
     ----------
-    path : str
-        Path to the image file.
+    img_gray : np.ndarray
+        2D grayscale image.
+    start, stop : int, optional
+        Only compute the codes of rows `start:stop` (the rows around them
+        are read as neighbours). Default = all rows.
 
     Returns
     -------
     np.ndarray
-        2D LBP image as a grayscale numpy array.
+        2D LBP image (uint8) of rows `start:stop`.
     """
-    img_bgr = cv2.imread(path, 1)                         # Load image in BGR
-    height, width, _ = img_bgr.shape
-    img_gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)  # Convert to grayscale
-
-    # Initialize output LBP image
+    full_height, width = img_gray.shape
+    if stop is None:
+        stop = full_height
+    height = stop - start
+
+    # Pad by one pixel on every side. Row/column -1 wraps to the last
+    # row/column; everything past the end gets -1 so it never is >= center.
+    # The row above `start` is row `start - 1`, i.e. the last row for start=0.
+    padded = np.full((height + 2, width + 2), -1, dtype=np.int16)
+    padded[1:-1, 1:-1] = img_gray[start:stop]
+    padded[0, 1:-1] = img_gray[start - 1, :]
+    padded[1:-1, 0] = img_gray[start:stop, -1]
+    padded[0, 0] = img_gray[start - 1, -1]
+    if stop < full_height:
+        padded[-1, 1:-1] = img_gray[stop, :]
+        padded[-1, 0] = img_gray[stop, -1]
+
+    center = padded[1:-1, 1:-1]
     img_lbp = np.zeros((height, width), np.uint8)
 
-    # Loop through each pixel and compute its LBP code
-    for i in range(height):
-        for j in range(width):
-            img_lbp[i, j] = lbp_calculated_pixel(img_gray, i, j)
+    # Compare every neighbour plane with the center at once and set its bit
+    for bit, (dx, dy) in enumerate(NEIGHBOUR_OFFSETS):
+        neighbour = padded[1 + dx:height + 1 + dx, 1 + dy:width + 1 + dy]
+        img_lbp |= (neighbour >= center).astype(np.uint8) << bit
 
     return img_lbp
 
 
-def get_lbp_features(path):
+def lbp_implementation(image):
+    """
+    Apply Local Binary Pattern (LBP) transformation on an image.
+
+    Parameters
+    ----------
+    image : str, np.ndarray or ImageContext
+        Path to the image file, an already-decoded grayscale/BGR array,
+        or a shared image context.
+
+    Returns
+    -------
+    np.ndarray
+        2D LBP image as a grayscale numpy array.
+    """
+    return lbp_transform(as_image_context(image).gray)
+
+
+def get_lbp_features(image, features=None, memory_budget=None):
     """
     Extract basic statistical features from the LBP image.
 
     Parameters
     ----------
-    path : str
-        Path to the input image.
+    image : str, np.ndarray or ImageContext
+        Path to the input image, an already-decoded grayscale/BGR array,
+        or a shared image context.
+    features : list of str, optional
+        Subset of `get_lbp_feature_names()` to compute, in the desired
+        order. Statistics that are not needed (e.g. the median) are skipped.
+        Default = all features.
+    memory_budget : int, optional
+        If given, the LBP codes are computed in row stripes whose temporary
+        arrays stay below this many bytes, and their histograms are merged
+        (same results). Default = whole image at once.
 
     Returns
     -------
     list
-        List containing the following LBP statistics:
+        List containing the following LBP statistics (or the requested subset):
         - Mean
         - Median
         - Standard Deviation
         - Kurtosis
         - Skewness
     """
-    lbp_image = lbp_implementation(path).flatten()
-
-    mean = np.mean(lbp_image)
-    median = np.median(lbp_image)
-    std = np.std(lbp_image)
-    n = len(lbp_image)
-
-    # Calculate kurtosis (using custom formula)
-    squared_differences = (lbp_image - mean) ** 4
-    sum_of_squared_differences = np.sum(squared_differences)
-    kurtosis = (4 * sum_of_squared_differences) / (n * std ** 4) - 3
-
-    # Calculate skewness (Pearson's second skewness coefficient)
-    skewness = (3 * (mean - median)) / std
-
-    return [mean, median, std, kurtosis, skewness]
+    if features is None:
+        features = get_lbp_feature_names()
+
+    # All statistics come from one 256-bin histogram of the LBP codes
+    need_median = 'median_lbp' in features or 'skewness_lbp' in features
+    if memory_budget is None:
+        stats = channel_moments(lbp_implementation(image), median=need_median)
+    else:
+        img_gray = as_image_context(image).gray
+        accumulator = MomentAccumulator()
+        for start, stop in row_tiles(img_gray.shape, LBP_BYTES_PER_PIXEL, memory_budget, halo=1):
+            accumulator.add(lbp_transform(img_gray, start, stop))
+        stats = accumulator.result(median=need_median)
+
+    mean = stats['mean']
+    std = stats['std']
+    values = {'mean_lbp': mean, 'std_lbp': std}
+
+    if need_median:
+        median = stats['median']
+        values['median_lbp'] = median
+
+        # Calculate skewness (Pearson's second skewness coefficient)
+        values['skewness_lbp'] = (3 * (mean - median)) / std
+
+    # Calculate kurtosis (using custom formula): 4 * sum((x - mean)^4) / (n * std^4) - 3,
+    # where sum((x - mean)^4) = n * m4
+    values['kurtosis_lbp'] = (4 * stats['m4']) / (std ** 4) - 3
+
+    return [values[name] for name in features]
 
 
 def get_lbp_feature_names():
@@ -0,0 +1,378 @@
+"""
+============================================
+📌 Pipeline Stage Metrics (Python)
+============================================
+
+Description:
+------------
+This program measures where the time of an upload goes and exposes the
+aggregated numbers in the Prometheus text format. Each request collects the
+duration of its stages (decoding, Multi-Otsu masking, every feature family,
+prediction, DB commit, ...) in a `StageTimings` object; when the request is
+done the timings are published to the process-wide `metrics` registry,
+together with the upload size and the image dimensions. Background jobs
+return their timings with their result, so stages that ran in a worker
+process are published by the web process too.
+
+Summaries keep a sliding window of recent observations per label set, from
+which the 0.5 / 0.95 / 0.99 quantiles are computed, plus an all-time count
+and sum. Counters only grow.
+
+The registry lives in the memory of one process. With several web worker
+processes (e.g. `gunicorn --workers 4`) every scrape is answered by
+whichever worker accepts it, and the quantiles of different workers cannot
+be merged. Serve the app from a single worker process (the Procfile does:
+gunicorn's default is one worker; add threads with `--threads` for
+concurrency), or scrape every worker separately.
+
+Features:
+---------
+✅ `StageTimings`: per-request stage durations (`with timings.stage(name):`)
+✅ Summaries (count, sum, p50 / p95 / p99) and counters with labels
+✅ Gauges and counters read from a callback at scrape time (e.g. cached
+   results, cache hits)
+✅ Prometheus text exposition (`metrics.render()`), no extra dependency
+✅ Thread-safe
+
+Usage:
+------
+1. Time the stages of a request:
+   `timings = StageTimings()` and `with timings.stage('predict'): ...`.
+2. Publish them: `record_request(timings, image_shape, nbytes, mode)`.
+3. Serve `metrics.render()` on `/metrics` (content type `CONTENT_TYPE`).
+   The app only serves it with the admin token (as the profile pages).
+
+Example:
+--------
+timings = StageTimings()
+with timings.stage('decode'):
+    image = decode_image(data)
+record_request(timings, image.shape, len(data), mode='sync')
+print(metrics.render())
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Quantiles reported by every summary
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageTimings:
+    """
+    Durations of the stages of one request, in the order they started.
+
+    Stages may be nested (e.g. the 'feature_<family>' stages run inside
+    'feature_extraction'), so the request duration is the wall time since
+    the object was created, not the sum of the stages.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the enclosed block as stage `name` (added up if repeated).
+
+        Parameters
+        ----------
+        name : str
+            Stage name, e.g. 'multiotsu_masking'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """
+        Add a duration measured elsewhere (e.g. in a worker).
+
+        Parameters
+        ----------
+        name : str
+            Stage name.
+        seconds : float
+            Duration in seconds.
+        """
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        """
+        Seconds since the timings were created.
+        """
+        return time.perf_counter() - self.started
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    items = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + items + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Summary:
+    """
+    Count, sum and sliding-window quantiles of observations, per label set.
+    """
+
+    type = 'summary'
+
+    def __init__(self, name, help, window=1024):
+        self.name = name
+        self.help = help
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """
+        Record one observation.
+
+        Parameters
+        ----------
+        value : float
+            Observed value (e.g. seconds).
+        **labels
+            Label values of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'count': 0, 'sum': 0.0, 'recent': deque(maxlen=self.window)}
+            series['count'] += 1
+            series['sum'] += value
+            series['recent'].append(value)
+
+    def samples(self):
+        """
+        Current state of every series.
+
+        Returns
+        -------
+        dict
+            Label tuple -> {'count', 'sum', 'quantiles': {q: value}}.
+        """
+        with self._lock:
+            snapshot = {key: (series['count'], series['sum'], list(series['recent']))
+                        for key, series in self._series.items()}
+        return {
+            key: {'count': count, 'sum': total,
+                  'quantiles': dict(zip(QUANTILES, np.quantile(recent, QUANTILES).tolist()))}
+            for key, (count, total, recent) in snapshot.items()
+        }
+
+    def render(self):
+        lines = []
+        for key, sample in sorted(self.samples().items()):
+            for quantile, value in sample['quantiles'].items():
+                lines.append(f"{self.name}{_format_labels(key + (('quantile', quantile),))} {_format_value(value)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(sample['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {sample['count']}")
+        return lines
+
+
+class Counter:
+    """
+    Monotonically increasing totals, per label set.
+    """
+
+    type = 'counter'
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+
+        Parameters
+        ----------
+        amount : int or float, optional
+            Increment (>= 0). Default is 1.
+        **labels
+            Label values of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge:
+    """
+    Value read from a callback when the metrics are rendered.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, help, function):
+        self.name = name
+        self.help = help
+        self.function = function
+
+    def render(self):
+        return [f"{self.name} {_format_value(self.function())}"]
+
+
+class CallbackCounter(Gauge):
+    """
+    Total read from a callback when the metrics are rendered (a count kept
+    by another object, e.g. cache hits). The callback must never decrease.
+    """
+
+    type = 'counter'
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def summary(self, name, help, window=1024):
+        """Create (or get) a summary."""
+        return self._register(Summary(name, help, window))
+
+    def counter(self, name, help):
+        """Create (or get) a counter."""
+        return self._register(Counter(name, help))
+
+    def gauge(self, name, help, function):
+        """Create (or replace) a gauge reading `function()` at render time."""
+        gauge = Gauge(name, help, function)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def callback_counter(self, name, help, function):
+        """Create (or replace) a counter reading `function()` at render time."""
+        counter = CallbackCounter(name, help, function)
+        with self._lock:
+            self._metrics[name] = counter
+        return counter
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            The exposition text (ends with a newline).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registry shared by the whole process
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.summary(
+    'cerviscan_stage_seconds', "Duration of each upload processing stage in seconds.")
+REQUEST_SECONDS = metrics.summary(
+    'cerviscan_request_seconds', "Duration of the processing of an upload in seconds.")
+IMAGE_WIDTH = metrics.summary(
+    'cerviscan_image_width_pixels', "Width of the processed images in pixels.")
+IMAGE_HEIGHT = metrics.summary(
+    'cerviscan_image_height_pixels', "Height of the processed images in pixels.")
+UPLOADS = metrics.counter(
+    'cerviscan_uploads_total', "Number of processed uploads by mode and cache outcome.")
+BYTES_PROCESSED = metrics.counter(
+    'cerviscan_processed_bytes_total', "Bytes of uploaded image files processed.")
+PIXELS_PROCESSED = metrics.counter(
+    'cerviscan_processed_pixels_total', "Pixels of images run through the pipeline.")
+
+
+def record_stages(timings):
+    """
+    Publish stage durations to `cerviscan_stage_seconds`.
+
+    Parameters
+    ----------
+    timings : StageTimings or dict
+        Stage durations (a dict as in `StageTimings.seconds` for timings
+        returned by a worker process).
+    """
+    seconds = timings.seconds if isinstance(timings, StageTimings) else timings
+    for stage, value in seconds.items():
+        STAGE_SECONDS.observe(value, stage=stage)
+
+
+def record_request(timings, image_shape=None, nbytes=None, mode='sync', cache='miss', seconds=None):
+    """
+    Publish the metrics of one processed upload.
+
+    Parameters
+    ----------
+    timings : StageTimings or dict
+        Stage durations of the upload.
+    image_shape : tuple, optional
+        Shape of the decoded image (height, width, ...). None for cache hits.
+    nbytes : int, optional
+        Size of the uploaded file in bytes.
+    mode : str, optional
+        'sync', 'background' or 'batch'. Default is 'sync'.
+    cache : str, optional
+        'hit' or 'miss'. Default is 'miss'.
+    seconds : float, optional
+        Duration of the upload. Default = `timings.elapsed()`.
+    """
+    record_stages(timings)
+    if seconds is None:
+        seconds = timings.elapsed()
+    REQUEST_SECONDS.observe(seconds, mode=mode, cache=cache)
+    UPLOADS.inc(mode=mode, cache=cache)
+    if nbytes is not None:
+        BYTES_PROCESSED.inc(nbytes, mode=mode)
+    if image_shape is not None:
+        height, width = image_shape[:2]
+        IMAGE_WIDTH.observe(width)
+        IMAGE_HEIGHT.observe(height)
+        PIXELS_PROCESSED.inc(width * height, mode=mode)
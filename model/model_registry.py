@@ -0,0 +1,217 @@
+"""
+============================================
+📌 Warm Model Registry (Python)
+============================================
+
+Description:
+------------
+This program keeps the trained classifier (`xgb_best.pkl`) loaded in memory
+so that each prediction only pays for `predict`, not for unpickling the
+model. The model is loaded once per process (or once in the gunicorn master
+when the app is preloaded, and then shared with the forked workers), and can
+be reloaded explicitly when the pickle file changes on disk.
+
+Features:
+---------
+✅ Loads the pickled model once and reuses it for every request
+✅ Thread-safe lazy loading
+✅ Exposes the feature names the model expects, in order
+✅ Detects changes of the pickle (modification time, then SHA-256) and reloads
+✅ Records load duration, load time and the hash of the loaded file
+✅ `snapshot()` returns the model with its feature names and hash, swapped
+   together on reload (never a new feature list with the old model)
+
+Usage:
+------
+1. Use the shared `model_registry` (or create a `ModelRegistry(path)`).
+2. Call `model_registry.get()` to obtain the loaded model.
+3. Call `model_registry.reload_if_changed()` to pick up a new pickle.
+
+Example:
+--------
+from model.model_registry import model_registry
+
+loaded = model_registry.snapshot()
+prediction = loaded.model.predict(features[loaded.feature_names])
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from model.single_image_extractor import get_model_feature_names
+
+# Default location of the trained classifier
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xgb_best.pkl')
+
+# One loaded model and what belongs to it; replaced as a whole on reload
+LoadedModel = namedtuple('LoadedModel', ['model', 'feature_names', 'sha256', 'mtime', 'load_seconds', 'loaded_at'])
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 hex digest of a file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    str
+        Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _loaded_field(name):
+    """Read-only attribute of the registry's current `LoadedModel` (None before the first load)."""
+    return property(lambda self: getattr(self.loaded, name) if self.loaded is not None else None)
+
+
+class ModelRegistry:
+    """
+    Holds one loaded model and reloads it when its pickle file changes.
+
+    The model, its feature names and its hash are kept in a single
+    `LoadedModel` that a reload replaces in one assignment. Code that needs
+    more than one of them should read them from one `snapshot()`; the
+    attributes below each read the current snapshot.
+    """
+
+    def __init__(self, path=DEFAULT_MODEL_PATH):
+        """
+        Create a registry for the pickled model at `path` (not loaded yet).
+
+        Parameters
+        ----------
+        path : str
+            Path to the pickled model.
+        """
+        self.path = path
+        self.loaded = None
+        self._lock = threading.Lock()
+
+    model = _loaded_field('model')
+    feature_names = _loaded_field('feature_names')
+    sha256 = _loaded_field('sha256')
+    mtime = _loaded_field('mtime')
+    load_seconds = _loaded_field('load_seconds')
+    loaded_at = _loaded_field('loaded_at')
+
+    def load(self):
+        """
+        Load (or reload) the model from disk.
+
+        Returns
+        -------
+        object
+            The loaded model.
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self):
+        start = time.perf_counter()
+        mtime = os.path.getmtime(self.path)
+        sha256 = file_sha256(self.path)
+        with open(self.path, 'rb') as f:
+            model = pickle.load(f)
+
+        # Everything is built first and published in a single assignment
+        self.loaded = LoadedModel(model, get_model_feature_names(model), sha256, mtime,
+                                  time.perf_counter() - start, datetime.now())
+        return model
+
+    def snapshot(self):
+        """
+        Get the loaded model with its feature names and hash, loading it on first use.
+
+        Returns
+        -------
+        LoadedModel
+            'model', 'feature_names', 'sha256', 'mtime', 'load_seconds' and
+            'loaded_at' of one load (a later reload does not change it).
+        """
+        loaded = self.loaded
+        if loaded is None:
+            with self._lock:
+                if self.loaded is None:
+                    self._load()
+                loaded = self.loaded
+        return loaded
+
+    def get(self):
+        """
+        Get the loaded model, loading it on first use.
+
+        Returns
+        -------
+        object
+            The loaded model.
+        """
+        return self.snapshot().model
+
+    def reload_if_changed(self):
+        """
+        Reload the model if the pickle file changed since it was loaded.
+
+        The cheap modification time check comes first; the file is only
+        hashed (and reloaded) when the modification time differs.
+
+        Returns
+        -------
+        bool
+            True if the model was reloaded.
+        """
+        if self.model is None:
+            self.get()
+            return False
+        if os.path.getmtime(self.path) == self.mtime:
+            return False
+
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self.mtime:
+                return False
+            if file_sha256(self.path) == self.sha256:
+                self.loaded = self.loaded._replace(mtime=mtime)   # Touched but identical content
+                return False
+            self._load()
+            return True
+
+    def info(self):
+        """
+        Describe the loaded model.
+
+        Returns
+        -------
+        dict
+            Path, SHA-256, modification time, load duration (seconds),
+            load time and number of expected features.
+        """
+        loaded = self.loaded or LoadedModel(None, None, None, None, None, None)
+        return {
+            'path': self.path,
+            'sha256': loaded.sha256,
+            'mtime': loaded.mtime,
+            'load_seconds': loaded.load_seconds,
+            'loaded_at': loaded.loaded_at,
+            'n_features': len(loaded.feature_names) if loaded.feature_names else 0,
+        }
+
+
+# Registry shared by the whole process
+model_registry = ModelRegistry()
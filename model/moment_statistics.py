@@ -0,0 +1,328 @@
+"""
+============================================
+📌 Histogram-Based Moment Statistics (Python)
+============================================
+
+Description:
+------------
+This program computes the statistical moments used by the color moment,
+LBP and Tamura extractors (mean, standard deviation, skewness, kurtosis and
+median). For 8-bit channels every statistic is computed exactly from a
+single 256-bin `np.bincount` of the pixels, so the pixel data is read once
+per channel instead of once per statistic. Other channels (e.g. float YUV
+or LAB values) fall back to direct computation on the array.
+
+Features:
+---------
+✅ One pass over the pixels per 8-bit channel (a 256-bin histogram)
+✅ Mean, variance, standard deviation, 3rd/4th central moments
+✅ Skewness with the same convention as `scipy.stats.skew` (biased, NaN for
+   constant channels)
+✅ Excess kurtosis and (optional) median, identical to `np.median`
+✅ Fallback for float channels with the same outputs
+✅ `MomentAccumulator`: the same statistics accumulated tile by tile (merged
+   histograms for 8-bit tiles, pairwise-merged central moments otherwise)
+
+Usage:
+------
+1. Call `channel_moments(channel)` on a 2D channel (or any array).
+2. Read the statistics from the returned dictionary.
+3. Pass `median=True` when the median is needed.
+4. For images processed in tiles, `add()` every tile to a
+   `MomentAccumulator` and call `result()` at the end, or let
+   `tiled_channel_moments` walk the stripes of an image.
+
+Example:
+--------
+import cv2
+from moment_statistics import channel_moments
+
+gray = cv2.imread("sample_image.png", cv2.IMREAD_GRAYSCALE)
+stats = channel_moments(gray, median=True)
+print(stats['mean'], stats['std'], stats['skew'], stats['median'])
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import numpy as np
+
+from model.tiling import row_tiles
+
+# Gray levels of an 8-bit channel
+LEVELS = np.arange(256, dtype=np.float64)
+
+
+def channel_histogram(channel):
+    """
+    Count the occurrences of each gray level in an 8-bit channel.
+
+    Parameters
+    ----------
+    channel : numpy.ndarray
+        Array of dtype uint8.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of 256 counts.
+    """
+    return np.bincount(channel.ravel(), minlength=256)
+
+
+def histogram_moments(histogram, median=False):
+    """
+    Compute the moment statistics of a channel from its 256-bin histogram.
+
+    Parameters
+    ----------
+    histogram : numpy.ndarray
+        Counts per gray level (see `channel_histogram`).
+    median : bool, optional
+        Also compute the median. Default is False.
+
+    Returns
+    -------
+    dict
+        'n', 'mean', 'var', 'std', 'm3', 'm4', 'skew', 'kurtosis' and, if
+        requested, 'median'.
+    """
+    counts = np.asarray(histogram, dtype=np.float64)
+    n = counts.sum()
+    mean = counts @ LEVELS / n
+
+    # Central moments over the 256 levels instead of all pixels
+    deviation = LEVELS - mean
+    deviation2 = deviation * deviation
+    m2 = counts @ deviation2 / n
+    m3 = counts @ (deviation2 * deviation) / n
+    m4 = counts @ (deviation2 * deviation2) / n
+
+    stats = finish_moments(n, mean, m2, m3, m4)
+
+    if median:
+        # Same as np.median: average of the two middle values when n is even
+        cumulative = np.cumsum(histogram)
+        total = int(cumulative[-1])
+        lower = np.searchsorted(cumulative, (total - 1) // 2, side='right')
+        upper = np.searchsorted(cumulative, total // 2, side='right')
+        stats['median'] = (LEVELS[lower] + LEVELS[upper]) / 2
+
+    return stats
+
+
+def array_moments(values, median=False):
+    """
+    Compute the moment statistics of a channel directly from its values.
+
+    Used for channels that are not 8-bit (e.g. float YUV or LAB values).
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Channel values.
+    median : bool, optional
+        Also compute the median. Default is False.
+
+    Returns
+    -------
+    dict
+        Same keys as `histogram_moments`.
+    """
+    values = np.asarray(values).ravel()
+    n = values.size
+    mean = np.mean(values, dtype=np.float64)
+
+    deviation = values - mean
+    deviation2 = deviation * deviation
+    m2 = np.mean(deviation2, dtype=np.float64)
+    m3 = np.mean(deviation2 * deviation, dtype=np.float64)
+    m4 = np.mean(deviation2 * deviation2, dtype=np.float64)
+
+    stats = finish_moments(n, mean, m2, m3, m4)
+
+    if median:
+        stats['median'] = np.median(values)
+
+    return stats
+
+
+def finish_moments(n, mean, m2, m3, m4):
+    """
+    Derive the standard statistics from the central moments.
+
+    Parameters
+    ----------
+    n : int or float
+        Number of values.
+    mean : float
+        Mean.
+    m2, m3, m4 : float
+        Second, third and fourth central moments.
+
+    Returns
+    -------
+    dict
+        'n', 'mean', 'var', 'std', 'm3', 'm4', 'skew' and 'kurtosis'.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Like scipy.stats.skew: NaN when the variance is zero up to precision
+        zero = m2 <= (np.finfo(np.float64).eps * mean) ** 2
+        skew = np.nan if zero else m3 / m2 ** 1.5
+        kurtosis = np.nan if zero else m4 / m2 ** 2 - 3
+
+    return {
+        'n': n,
+        'mean': mean,
+        'var': m2,
+        'std': np.sqrt(m2),
+        'm3': m3,
+        'm4': m4,
+        'skew': skew,
+        'kurtosis': kurtosis,
+    }
+
+
+def channel_moments(channel, median=False):
+    """
+    Compute the moment statistics of a channel with the cheapest exact method.
+
+    8-bit channels use a single 256-bin histogram; other channels fall back
+    to `array_moments`.
+
+    Parameters
+    ----------
+    channel : numpy.ndarray
+        Channel values.
+    median : bool, optional
+        Also compute the median. Default is False.
+
+    Returns
+    -------
+    dict
+        'n', 'mean', 'var', 'std', 'm3', 'm4', 'skew', 'kurtosis' and, if
+        requested, 'median'.
+    """
+    channel = np.asarray(channel)
+    if channel.dtype == np.uint8:
+        return histogram_moments(channel_histogram(channel), median)
+    return array_moments(channel, median)
+
+
+class MomentAccumulator:
+    """
+    Moment statistics of a channel that is processed tile by tile.
+
+    8-bit tiles are added to a 256-bin histogram, which gives exactly the
+    same statistics as `channel_moments` on the whole channel. Other tiles
+    are summarized with `array_moments` and merged with the pairwise update
+    formulas for central moments (Pébay, 2008), so no tile is kept.
+    """
+
+    def __init__(self):
+        self.histogram = None
+        self.n = 0
+        self.mean = 0.0
+        self.M2 = 0.0   # Sums of squared, cubed and 4th-power deviations
+        self.M3 = 0.0
+        self.M4 = 0.0
+
+    def add(self, values):
+        """
+        Add the values of one tile.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Channel values of the tile (all tiles 8-bit, or none).
+        """
+        values = np.asarray(values)
+        if values.dtype == np.uint8:
+            if self.n:
+                raise ValueError("Cannot mix 8-bit and other tiles in one MomentAccumulator.")
+            tile = channel_histogram(values)
+            self.histogram = tile if self.histogram is None else self.histogram + tile
+            return
+        if self.histogram is not None:
+            raise ValueError("Cannot mix 8-bit and other tiles in one MomentAccumulator.")
+        if values.size == 0:
+            return
+
+        stats = array_moments(values)
+        nb = stats['n']
+        M2b, M3b, M4b = stats['var'] * nb, stats['m3'] * nb, stats['m4'] * nb
+        if self.n == 0:
+            self.n, self.mean, self.M2, self.M3, self.M4 = nb, stats['mean'], M2b, M3b, M4b
+            return
+
+        na, M2a, M3a, M4a = self.n, self.M2, self.M3, self.M4
+        n = na + nb
+        delta = stats['mean'] - self.mean
+        delta_n = delta / n
+
+        self.mean = self.mean + delta_n * nb
+        self.M4 = (M4a + M4b
+                   + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                   + 6 * delta_n ** 2 * (na * na * M2b + nb * nb * M2a)
+                   + 4 * delta_n * (na * M3b - nb * M3a))
+        self.M3 = (M3a + M3b
+                   + delta * delta_n ** 2 * na * nb * (na - nb)
+                   + 3 * delta_n * (na * M2b - nb * M2a))
+        self.M2 = M2a + M2b + delta * delta_n * na * nb
+        self.n = n
+
+    def result(self, median=False):
+        """
+        Statistics of all the values added so far.
+
+        Parameters
+        ----------
+        median : bool, optional
+            Also compute the median (8-bit tiles only). Default is False.
+
+        Returns
+        -------
+        dict
+            Same keys as `channel_moments`.
+        """
+        if self.histogram is not None:
+            return histogram_moments(self.histogram, median)
+        if median:
+            raise ValueError("The median is only available for 8-bit tiles.")
+        n = self.n
+        return finish_moments(n, self.mean, self.M2 / n, self.M3 / n, self.M4 / n)
+
+
+def tiled_channel_moments(image_array, channels, bytes_per_pixel, memory_budget, convert=None, median=False):
+    """
+    Moment statistics of several channels, computed stripe by stripe.
+
+    Parameters
+    ----------
+    image_array : numpy.ndarray
+        Image with shape (height, width, channels).
+    channels : dict
+        Maps a channel name to its index along the last axis (after `convert`).
+    bytes_per_pixel : int or float
+        Bytes of temporary arrays per pixel of one stripe (see `row_tiles`).
+    memory_budget : int or None
+        Maximum bytes of temporary arrays per stripe. None = one stripe.
+    convert : callable, optional
+        Applied to every stripe before taking the channels (e.g. a color
+        space conversion). Default = use the stripe as is.
+    median : bool, optional
+        Also compute the median (8-bit channels only). Default is False.
+
+    Returns
+    -------
+    dict
+        Channel name -> statistics (same keys as `channel_moments`).
+    """
+    accumulators = {name: MomentAccumulator() for name in channels}
+    for start, stop in row_tiles(image_array.shape, bytes_per_pixel, memory_budget):
+        tile = image_array[start:stop]
+        if convert is not None:
+            tile = convert(tile)
+        for name, index in channels.items():
+            accumulators[name].add(tile[:, :, index])
+    return {name: accumulator.result(median) for name, accumulator in accumulators.items()}
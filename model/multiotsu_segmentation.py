@@ -11,6 +11,12 @@ threshold values to separate an image into different classes (regions of
 intensity). The program generates a binary mask that highlights the most 
 prominent segmented region in the image.
 
+For 8-bit images the thresholds are found from a single 256-bin histogram
+with a dynamic-programming search (instead of scikit-image's exhaustive
+search over every combination of thresholds), and the mask is produced with
+a 256-entry lookup table. The engine reproduces `threshold_multiotsu`
+exactly: same float32 between-class variances, same tie-breaking.
+
 Features:
 ---------
 ✅ Supports grayscale or single-channel images
@@ -18,37 +24,195 @@ Features:
 ✅ Converts segmented regions into a clean binary mask (0 and 255 values)
 ✅ Compatible with scikit-image for easy integration into computer vision pipelines
 ✅ Useful for preprocessing tasks in machine learning, medical imaging, or object detection
+✅ 8-bit images: one histogram pass, dynamic-programming threshold search and
+   a lookup-table mask (same output as the scikit-image implementation)
 
 Usage:
 ------
-1. Provide the path of an input image (e.g., "sample_image.png").
+1. Provide the path of an input image (e.g., "sample_image.png"), or the
+   grayscale image array itself.
 2. Call the function `multiotsu_masking(image_path)`.
 3. The function returns a binary mask (numpy array) where the segmented region is highlighted.
+4. `multiotsu_thresholds(image, classes)` returns the thresholds only.
 
 Example:
 --------
-python multiotsu_segmentation.py
+python -m model.multiotsu_segmentation image1.png image2.png
 
-This will segment the input image using Multi-Otsu method 
-and return the binary mask.
+This checks that the fast engine gives the same thresholds and masks as
+the scikit-image implementation on the given images (or on synthetic ones
+if none are given), and compares their run times.
+`tests/test_multiotsu_segmentation.py` pins the same equality.
 
 Author: Fillipus Aditya Nugroho
 ============================================
 """
 
-import matplotlib.pyplot as plt
+import argparse
+import time
+
+import cv2
 import numpy as np
-from skimage import io, img_as_ubyte
+from skimage import io
 from skimage.filters import threshold_multiotsu
 
-def multiotsu_masking(image_path):
+def _between_class_variance_table(prob):
     """
-    Perform image segmentation using Multi-Otsu thresholding.
+    Between-class variance term of every class [i, j] of histogram bins.
+
+    Reproduces scikit-image's float32 lookup table, including its quirks:
+    the first moment of bin 0 is `prob[0]` (not 0 * prob[0]) and the term of
+    the class made of bin 0 alone is 0.
+
+    Parameters
+    ----------
+    prob : numpy.ndarray
+        Normalized histogram (float32).
+
+    Returns
+    -------
+    numpy.ndarray
+        (nbins, nbins) float32 array; entry [i, j] is the term of the class
+        made of bins i..j (0 below the diagonal).
+    """
+    nbins = prob.size
+    weighted = np.arange(nbins, dtype=np.float32) * prob
+    weighted[0] = prob[0]
+    zeroth = np.cumsum(prob, dtype=np.float32)
+    first = np.cumsum(weighted, dtype=np.float32)
+
+    zeroth_before = np.concatenate(([0], zeroth[:-1])).astype(np.float32)
+    first_before = np.concatenate(([0], first[:-1])).astype(np.float32)
+    zeroth_ij = zeroth[None, :] - zeroth_before[:, None]
+    first_ij = first[None, :] - first_before[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = np.where(zeroth_ij > 0, (first_ij * first_ij) / zeroth_ij, np.float32(0))
+    table = np.triu(table).astype(np.float32)
+    table[0, 0] = 0
+    return table
+
+
+def _multiotsu_threshold_indices(prob, thresh_count):
+    """
+    Find the Multi-Otsu threshold indices with a dynamic-programming search.
+
+    The best total between-class variance is found in O(thresh_count * nbins^2).
+    Only the combinations within float32 rounding of that optimum are then
+    evaluated the way scikit-image does (float32 sums, first combination in
+    lexicographic order wins), so ties resolve identically. Thresholds that
+    could slide left over empty bins without changing any class are skipped:
+    they tie exactly with their leftmost position, which comes first.
+
+    Parameters
+    ----------
+    prob : numpy.ndarray
+        Normalized histogram (float32).
+    thresh_count : int
+        Number of thresholds (classes - 1).
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the thresholds (the last bin of each class but the last).
+    """
+    nbins = prob.size
+    table32 = _between_class_variance_table(prob)
+    table = table32.astype(np.float64)
+    last = nbins - 1
+
+    # best[k][t]: best value of the classes after a threshold at bin t when
+    # k more thresholds follow it
+    best = np.full((thresh_count, nbins), -np.inf)
+    best[0, :last] = table[1:, last]
+    above = np.triu(np.ones((last, last), dtype=bool), k=1)   # t > s
+    for k in range(1, thresh_count):
+        candidates = np.where(above, table[1:, :last] + best[k - 1, :last], -np.inf)
+        best[k, :last] = candidates.max(axis=1)
+
+    optimum = np.max(table[0, :last] + best[thresh_count - 1, :last])
+    tolerance = abs(optimum) * 2.0 ** -20
+
+    found = {'sigma': np.float32(0), 'indices': None}
+    indices = [0] * thresh_count
+
+    def search(k, start, value):
+        if k == thresh_count:
+            sigma = table32[0, indices[0]] + table32[indices[-1] + 1, last]
+            for a, b in zip(indices[:-1], indices[1:]):
+                sigma += table32[a + 1, b]
+            if sigma > found['sigma']:
+                found['sigma'] = sigma
+                found['indices'] = list(indices)
+            return
+
+        remaining = thresh_count - 1 - k
+        for t in range(start, last - remaining):
+            # Skip thresholds that tie with one further left (empty bin)
+            if prob[t] == 0 and t > start and not (k == 0 and t == 1):
+                continue
+            if value + table[start, t] + best[remaining, t] >= optimum - tolerance:
+                indices[k] = t
+                search(k + 1, t + 1, value + table[start, t])
+
+    search(0, 0, 0.0)
+    return np.array(found['indices'], dtype=np.intp)
+
+
+def multiotsu_thresholds(image, classes=5):
+    """
+    Compute the Multi-Otsu thresholds of an image.
+
+    8-bit images use the histogram / dynamic-programming engine; other
+    images fall back to `skimage.filters.threshold_multiotsu`. Both give the
+    same thresholds.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Grayscale image.
+    classes : int, optional
+        Number of classes. Default is 5.
+
+    Returns
+    -------
+    numpy.ndarray
+        The `classes - 1` thresholds.
+    """
+    if image.dtype != np.uint8:
+        return threshold_multiotsu(image, classes=classes)
+
+    # Same histogram as scikit-image: one bin per value from min to max
+    histogram = np.bincount(image.ravel(), minlength=256)
+    occupied = np.flatnonzero(histogram)
+    low, high = occupied[0], occupied[-1]
+    prob = (histogram[low:high + 1] / histogram.sum()).astype(np.float32)
+
+    nvalues = occupied.size
+    if nvalues < classes:
+        raise ValueError(
+            f'After discretization into bins, the input image has '
+            f'only {nvalues} different values. It cannot be thresholded '
+            f'in {classes} classes. If there are more unique values '
+            f'before discretization, try increasing the number of bins '
+            f'(`nbins`).'
+        )
+    elif nvalues == classes:
+        thresh_idx = np.flatnonzero(prob)[:-1]
+    else:
+        thresh_idx = _multiotsu_threshold_indices(prob, classes - 1)
+
+    return low + thresh_idx
+
+
+def multiotsu_masking_skimage(image_path):
+    """
+    Multi-Otsu masking with scikit-image (reference implementation).
 
     Parameters
     ----------
-    image_path : str
-        Path to the input image file.
+    image_path : str or numpy.ndarray
+        Path to the input image file, or an already-decoded grayscale image.
 
     Returns
     -------
@@ -56,7 +220,10 @@ def multiotsu_masking(image_path):
         Binary mask of the segmented image, with values 0 (background) 
         and 255 (foreground region).
     """
-    image = io.imread(image_path)
+    if isinstance(image_path, np.ndarray):
+        image = image_path
+    else:
+        image = io.imread(image_path)
     
     # Compute multi-Otsu thresholds
     threshold = threshold_multiotsu(image, classes=5)
@@ -70,3 +237,69 @@ def multiotsu_masking(image_path):
     output[output >= np.unique(output)[-1]] = 255
 
     return output
+
+
+def multiotsu_masking(image_path):
+    """
+    Perform image segmentation using Multi-Otsu thresholding.
+
+    Parameters
+    ----------
+    image_path : str or numpy.ndarray
+        Path to the input image file, or an already-decoded grayscale image.
+
+    Returns
+    -------
+    output : numpy.ndarray
+        Binary mask of the segmented image, with values 0 (background) 
+        and 255 (foreground region).
+    """
+    if isinstance(image_path, np.ndarray):
+        image = image_path
+    else:
+        image = io.imread(image_path)
+
+    if image.dtype != np.uint8 or image.ndim != 2:
+        return multiotsu_masking_skimage(image)
+
+    # The top class (values >= the highest threshold) always contains the
+    # image maximum, so it is the region kept in the mask
+    threshold = multiotsu_thresholds(image, classes=5)
+    lut = np.where(np.arange(256) >= threshold[-1], 255, 0).astype(np.uint8)
+    return cv2.LUT(image, lut)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the fast Multi-Otsu engine against scikit-image.")
+    parser.add_argument('images', nargs='*', help="Grayscale images to check (default: synthetic images)")
+    args = parser.parse_args()
+
+    if args.images:
+        images = [(path, cv2.imread(path, cv2.IMREAD_GRAYSCALE)) for path in args.images]
+    else:
+        rng = np.random.default_rng(0)
+        images = [
+            ('uniform noise', rng.integers(0, 256, (300, 400), dtype=np.uint8)),
+            ('gaussian', np.clip(rng.normal(120, 40, (300, 400)), 0, 255).astype(np.uint8)),
+            ('few values', rng.choice(rng.choice(256, 12, replace=False), (300, 400)).astype(np.uint8)),
+            ('narrow range', rng.integers(90, 140, (300, 400), dtype=np.uint8)),
+        ]
+
+    mismatches = 0
+    for name, image in images:
+        start = time.perf_counter()
+        expected_thresholds = threshold_multiotsu(image, classes=5)
+        expected = multiotsu_masking_skimage(image)
+        reference_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        thresholds = multiotsu_thresholds(image, classes=5)
+        mask = multiotsu_masking(image)
+        fast_seconds = time.perf_counter() - start
+
+        same = np.array_equal(thresholds, expected_thresholds) and np.array_equal(mask, expected)
+        mismatches += not same
+        print(f"{name}: thresholds {thresholds.tolist()} vs {expected_thresholds.tolist()}, "
+              f"{'equal' if same else 'DIFFERENT'}, {reference_seconds:.3f}s -> {fast_seconds:.4f}s")
+
+    print(f"{len(images) - mismatches} / {len(images)} images equal")
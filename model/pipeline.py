@@ -0,0 +1,464 @@
+"""
+============================================
+📌 In-Memory Upload Processing Pipeline (Python)
+============================================
+
+Description:
+------------
+This program chains the upload processing stages (grayscale conversion,
+Multi-Otsu masking, mask overlay and feature extraction) entirely in memory.
+Each stage receives the numpy array produced by the previous one, so the
+intermediate images are no longer written to disk and decoded again between
+stages. The artifacts shown to the user (original, gray, mask, segmented)
+are persisted only once, at the end, optionally on a background thread.
+
+Features:
+---------
+✅ Decodes the uploaded bytes once
+✅ Passes numpy arrays between `rgb_to_gray_converter`, `multiotsu_masking`,
+   `get_segmented_image` and `SingleImageFeatureExtractor`
+✅ Writes every artifact exactly once, after processing
+✅ Optional background writer so disk I/O overlaps prediction and the DB commit
+✅ `run_upload_job` runs a whole upload in a background worker process
+✅ Optional region-of-interest crop (mask bounding box + padding) before the
+   texture features, see `roi_crop.py`
+✅ `stack_features` stacks the features of several images for one batched `predict`
+✅ Optional stage timings (`timings=StageTimings()`, see `metrics.py`)
+✅ Optional profiling of background jobs (see `profiling.py`)
+
+Usage:
+------
+1. Decode the uploaded bytes: `image = decode_image(data)`.
+2. Run the stages: `processed = process_image(image, feature_names)`.
+3. Build the artifact paths with `artifact_paths(artifact_filename(data), ...)`
+   and persist them with `save_artifacts(...)` or `save_artifacts_async(...)`.
+
+Example:
+--------
+data = open("upload.png", "rb").read()
+processed = process_image(decode_image(data))
+paths = artifact_paths(artifact_filename(data), "./static/uploads", "./static/processed")
+save_artifacts(processed, paths, data)
+print(processed['features'])
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from model.rgb_to_gray import rgb_to_gray_converter
+from model.multiotsu_segmentation import multiotsu_masking
+from model.bitwise_operation import get_segmented_image
+from model.roi_crop import mask_bounding_box, crop_to_box
+from model.image_context import ImageContext
+from model.single_image_extractor import SingleImageFeatureExtractor
+from model.model_registry import model_registry
+from model.metrics import StageTimings
+from model.feature_storage import encode_features
+from model.profiling import ProfileStore, start_profiler, upload_metadata
+
+# Version of the processing stages; bump it whenever a change alters the
+# produced images or features, so cached results are not reused
+PIPELINE_VERSION = '1'
+
+
+def pipeline_version(roi_padding=None):
+    """
+    Version string of the pipeline with the given options.
+
+    Parameters
+    ----------
+    roi_padding : int, optional
+        ROI padding (see `process_image`). None = no cropping.
+
+    Returns
+    -------
+    str
+        `PIPELINE_VERSION`, extended with the options that change the features.
+    """
+    if roi_padding is None:
+        return PIPELINE_VERSION
+    return f"{PIPELINE_VERSION}+roi{roi_padding}"
+
+# Signatures of the formats OpenCV decodes and encodes -> artifact extension
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'BM', '.bmp'),
+    (b'II*\x00', '.tiff'),
+    (b'MM\x00*', '.tiff'),
+]
+
+# Extension of the artifacts of an upload in any other format (e.g. PPM): the
+# original is then re-encoded
+DEFAULT_EXTENSION = '.png'
+
+# Background thread(s) persisting the processed images
+artifact_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="artifact-writer")
+
+
+def decode_image(data):
+    """
+    Decode uploaded image bytes into a BGR array (same as `cv2.imread`).
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded image file content.
+
+    Returns
+    -------
+    numpy.ndarray
+        Decoded BGR image.
+
+    Raises
+    ------
+    ValueError
+        If the bytes are not a readable image.
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("The uploaded file is not a readable image.")
+    return image
+
+
+def validate_image(data):
+    """
+    Check that uploaded bytes can be decoded, without a full-size decode.
+
+    The same OpenCV decoder as `decode_image` reads the file at 1/8 scale in
+    grayscale (JPEGs are then decoded from their scaled-down DCT blocks), so
+    a file accepted here is also accepted by `decode_image`.
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded image file content.
+
+    Raises
+    ------
+    ValueError
+        If the bytes are not a readable image.
+    """
+    if cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8) is None:
+        raise ValueError("The uploaded file is not a readable image.")
+
+
+def process_image(original_image, feature_names=None, extractor=None, roi_padding=None, timings=None):
+    """
+    Run the segmentation and feature extraction stages in memory.
+
+    Parameters
+    ----------
+    original_image : numpy.ndarray
+        Decoded BGR image.
+    feature_names : list of str, optional
+        Features to extract (see `SingleImageFeatureExtractor.extract_features`).
+        Default = all features.
+    extractor : SingleImageFeatureExtractor, optional
+        Extractor to use. A new one is created if not given.
+    roi_padding : int, optional
+        If given, the texture features are extracted from the segmented
+        image cropped to the mask's bounding box plus this padding (the
+        color moments still use the whole image). Default = no cropping.
+    timings : StageTimings, optional
+        Receives the duration of every stage ('gray_conversion',
+        'multiotsu_masking', 'segmentation', 'roi_crop', 'feature_extraction'
+        and the 'feature_<family>' runs inside it).
+
+    Returns
+    -------
+    dict
+        'original', 'gray', 'mask' and 'segmented' image arrays, the
+        extracted 'features' DataFrame and the 'roi' box (top, bottom,
+        left, right) used for the texture features (None if not cropped).
+    """
+    if extractor is None:
+        extractor = SingleImageFeatureExtractor()
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.stage('gray_conversion'):
+        gray_image = rgb_to_gray_converter(original_image)
+    with timings.stage('multiotsu_masking'):
+        mask_image = multiotsu_masking(gray_image)
+    with timings.stage('segmentation'):
+        segmented_image = get_segmented_image(original_image, mask_image)
+
+    roi = texture_image = None
+    if roi_padding is not None:
+        with timings.stage('roi_crop'):
+            roi = mask_bounding_box(mask_image, roi_padding)
+            texture_image = ImageContext.from_array(crop_to_box(segmented_image, roi))
+
+    with timings.stage('feature_extraction'):
+        features = extractor.extract_features(
+            ImageContext.from_array(segmented_image), feature_names=feature_names, texture_image=texture_image,
+            timings=timings,
+        )
+
+    return {
+        'original': original_image,
+        'gray': gray_image,
+        'mask': mask_image,
+        'segmented': segmented_image,
+        'features': features,
+        'roi': roi,
+    }
+
+
+def stack_features(processed_images):
+    """
+    Stack the features of several processed images into one matrix.
+
+    Parameters
+    ----------
+    processed_images : list of dict
+        Results of `process_image` (extracted with the same feature names).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per image, in the given order.
+    """
+    return pd.concat([processed['features'] for processed in processed_images], ignore_index=True)
+
+
+def prediction_label(prediction):
+    """
+    Convert a predicted class (0 or 1) to its label.
+
+    Parameters
+    ----------
+    prediction : int
+        Class predicted by the model.
+
+    Returns
+    -------
+    str
+        "normal" for class 0, otherwise "abnormal".
+    """
+    return "normal" if prediction == 0 else "abnormal"
+
+
+def run_upload_job(original_bytes, paths, roi_padding=None, memory_budget=None, profile_folder=None,
+                   profile_keep=50, model_sha256=None):
+    """
+    Process one upload end to end (used by the background job queue).
+
+    Decodes the image, runs the in-memory pipeline with the registry's model
+    (loaded once per worker process), persists the artifacts and predicts.
+    Worker processes outlive a model reload in the web process: when the
+    loaded model is not the expected one, the pickle is reloaded if it
+    changed on disk.
+
+    Parameters
+    ----------
+    original_bytes : bytes
+        The uploaded file content.
+    paths : dict
+        Result of `artifact_paths`.
+    roi_padding : int, optional
+        ROI padding (see `process_image`). Default = no cropping.
+    memory_budget : int, optional
+        Memory budget of the feature extraction (see
+        `SingleImageFeatureExtractor`). Default = no tiling.
+    profile_folder : str, optional
+        Profile the job and store the profile in this folder (see
+        `profiling.ProfileStore`). Default = no profiling.
+    profile_keep : int, optional
+        Number of profiles kept in `profile_folder`. Default is 50.
+    model_sha256 : str, optional
+        SHA-256 of the model the web process uses. Default = whichever
+        model the worker has loaded.
+
+    Returns
+    -------
+    dict
+        The extracted 'features' (compact, see `encode_features`), the
+        'prediction' label, the stage 'timings' (dict), the total processing
+        'seconds', the image 'shape' (so the web process can publish the
+        metrics), the 'profile_id' (None when not profiled) and the
+        'model_sha256' of the model that predicted.
+    """
+    timings = StageTimings()
+    profiler = start_profiler() if profile_folder else None
+    try:
+        with timings.stage('model_load'):
+            loaded = model_registry.snapshot()
+            if model_sha256 is not None and loaded.sha256 != model_sha256:
+                model_registry.reload_if_changed()
+                loaded = model_registry.snapshot()
+        with timings.stage('decode'):
+            image = decode_image(original_bytes)
+        processed = process_image(image, feature_names=loaded.feature_names,
+                                  extractor=SingleImageFeatureExtractor(memory_budget=memory_budget),
+                                  roi_padding=roi_padding, timings=timings)
+        save_artifacts(processed, paths, original_bytes, timings)
+        with timings.stage('predict'):
+            prediction = loaded.model.predict(processed['features'])
+    finally:
+        # The worker process is reused: never leave its profiler running
+        if profiler is not None:
+            profiler.disable()
+    profile_id = None
+    if profiler is not None:
+        profile_id = ProfileStore(profile_folder, profile_keep).save(
+            profiler, upload_metadata(timings, image.shape, len(original_bytes), mode='background'))
+    return {'features': encode_features(processed['features']), 'prediction': prediction_label(prediction[0]),
+            'timings': timings.seconds, 'seconds': timings.elapsed(), 'shape': image.shape,
+            'profile_id': profile_id, 'model_sha256': loaded.sha256}
+
+
+def image_extension(data):
+    """
+    File extension of encoded image bytes, read from their signature.
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded image file content.
+
+    Returns
+    -------
+    str or None
+        '.jpg', '.png', '.bmp', '.tiff' or '.webp'; None for other formats.
+    """
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    for signature, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return None
+
+
+def artifact_filename(data):
+    """
+    Unique file name of the artifacts of one upload.
+
+    The extension comes from the content (never from the client's file
+    name), so OpenCV can always encode the processed images under it.
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded image file content.
+
+    Returns
+    -------
+    str
+        A uuid4 hex name with the extension of `image_extension`, or
+        `DEFAULT_EXTENSION`.
+    """
+    return f"{uuid.uuid4().hex}{image_extension(data) or DEFAULT_EXTENSION}"
+
+
+def artifact_paths(filename, upload_folder, processed_folder):
+    """
+    Build the paths where the artifacts of one upload are stored.
+
+    Parameters
+    ----------
+    filename : str
+        Unique file name of the upload (see `artifact_filename`).
+    upload_folder : str
+        Folder of the original uploads.
+    processed_folder : str
+        Folder of the processed images.
+
+    Returns
+    -------
+    dict
+        Paths for 'original', 'gray', 'mask' and 'segmented'.
+    """
+    return {
+        'original': os.path.join(upload_folder, filename),
+        'gray': os.path.join(processed_folder, f'gray_{filename}'),
+        'mask': os.path.join(processed_folder, f'mask_{filename}'),
+        'segmented': os.path.join(processed_folder, f'segmented_{filename}'),
+    }
+
+
+def save_artifacts(processed, paths, original_bytes=None, timings=None):
+    """
+    Persist the artifacts of one upload.
+
+    Parameters
+    ----------
+    processed : dict
+        Result of `process_image`.
+    paths : dict
+        Result of `artifact_paths`.
+    original_bytes : bytes, optional
+        The uploaded file content. Stored as-is when its format matches the
+        extension of `paths['original']`; otherwise the decoded original
+        image is re-encoded.
+    timings : StageTimings, optional
+        Receives the duration of the writes as stage 'save_artifacts'.
+
+    Raises
+    ------
+    OSError
+        If an image could not be written.
+    """
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.stage('save_artifacts'):
+        keys = ('gray', 'mask', 'segmented')
+        extension = os.path.splitext(paths['original'])[1].lower()
+        if original_bytes is not None and image_extension(original_bytes) == extension:
+            with open(paths['original'], 'wb') as f:
+                f.write(original_bytes)
+        else:
+            keys = ('original',) + keys
+
+        for key in keys:
+            if not cv2.imwrite(paths[key], processed[key]):
+                raise OSError(f"Could not write {paths[key]}")
+
+
+def remove_artifacts(paths):
+    """
+    Delete the artifacts of one upload (those that exist).
+
+    Parameters
+    ----------
+    paths : dict
+        Result of `artifact_paths`.
+    """
+    for path in paths.values():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def save_artifacts_async(processed, paths, original_bytes=None, timings=None):
+    """
+    Persist the artifacts of one upload on the background writer thread.
+
+    Parameters
+    ----------
+    processed : dict
+        Result of `process_image`.
+    paths : dict
+        Result of `artifact_paths`.
+    original_bytes : bytes, optional
+        The uploaded file content.
+    timings : StageTimings, optional
+        Receives the duration of the writes (once the future completes).
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Completes when every artifact has been written.
+    """
+    return artifact_writer.submit(save_artifacts, processed, paths, original_bytes, timings)
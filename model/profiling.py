@@ -0,0 +1,306 @@
+"""
+============================================
+📌 On-Demand Upload Profiling (Python)
+============================================
+
+Description:
+------------
+This program profiles selected uploads with `cProfile` so a pathologically
+slow image can be investigated in production. An upload is profiled when
+profiling is enabled and it is sampled (a configurable fraction of the
+uploads), or when the request carries the admin profiling token in the
+`X-Profile-Token` header. The profile of every profiled upload is stored as
+a `.prof` file (readable with `pstats`, snakeviz, ...) next to a `.json`
+file with the image dimensions, the upload size, the stage timings (see
+`metrics.py`) and the most expensive functions. Only the most recent
+profiles are kept.
+
+`cProfile` only sees the thread (or worker process) it runs in: with a
+thread or process pool for the feature families, the family calls show up
+as waits on their futures.
+
+Features:
+---------
+✅ Sampling rate and admin token header to choose the profiled uploads
+✅ `.prof` file + JSON metadata (dimensions, stage timings, top functions)
+✅ Bounded number of stored profiles (oldest deleted first)
+✅ Listing and text statistics for the `/profiles` page and `flask profiles` CLI
+
+Usage:
+------
+1. Decide: `should_profile(enabled, sample_rate, token, request.headers.get(PROFILE_HEADER))`.
+2. Start: `profiler = start_profiler()`; run the pipeline; then
+   `ProfileStore(folder).save(profiler, upload_metadata(timings, image.shape))`.
+3. List the stored profiles with `store.list()` or `flask profiles list`, and
+   print one with `store.stats_text(profile_id)` or `flask profiles show ID`.
+
+Example:
+--------
+store = ProfileStore("./profiles", keep=50)
+timings = StageTimings()
+profiler = start_profiler()
+processed = process_image(image, timings=timings)
+profile_id = store.save(profiler, upload_metadata(timings, image.shape))
+print(store.stats_text(profile_id, limit=20))
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import uuid
+from datetime import datetime
+
+# Request header carrying the admin profiling token
+PROFILE_HEADER = 'X-Profile-Token'
+
+# Profile ids are uuid4 hex strings (also protects the file paths)
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def should_profile(enabled, sample_rate=0.0, token=None, request_token=None):
+    """
+    Decide whether an upload is profiled.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether sampled profiling is enabled.
+    sample_rate : float, optional
+        Fraction of the uploads profiled when enabled (0 to 1). Default is 0.
+    token : str, optional
+        Admin token; a request presenting it is always profiled.
+    request_token : str, optional
+        Token sent by the request (`PROFILE_HEADER`).
+
+    Returns
+    -------
+    bool
+        True if the upload should be profiled.
+    """
+    if token and request_token and hmac.compare_digest(str(token), str(request_token)):
+        return True
+    return bool(enabled) and random.random() < sample_rate
+
+
+def start_profiler():
+    """
+    Create and enable a profiler for the current thread.
+
+    Returns
+    -------
+    cProfile.Profile
+        The running profiler (pass it to `ProfileStore.save`).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def upload_metadata(timings, image_shape=None, nbytes=None, mode='sync', **extra):
+    """
+    Describe a profiled upload.
+
+    Parameters
+    ----------
+    timings : StageTimings
+        Stage durations of the upload.
+    image_shape : tuple, optional
+        Shape of the decoded image (height, width, ...).
+    nbytes : int, optional
+        Size of the uploaded file in bytes.
+    mode : str, optional
+        'sync' or 'background'. Default is 'sync'.
+    **extra
+        Other JSON-serializable values. Never the upload file name: it
+        addresses the patient images served under /static.
+
+    Returns
+    -------
+    dict
+        Metadata for `ProfileStore.save`.
+    """
+    height, width = image_shape[:2] if image_shape is not None else (None, None)
+    return {
+        'mode': mode,
+        'width': width,
+        'height': height,
+        'nbytes': nbytes,
+        'seconds': timings.elapsed(),
+        'stages': dict(timings.seconds),
+        **extra,
+    }
+
+
+def top_functions(stats, limit=15):
+    """
+    Most expensive functions of a profile, by cumulative time.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        Profile statistics.
+    limit : int, optional
+        Number of functions. Default is 15.
+
+    Returns
+    -------
+    list of dict
+        'function', 'calls', 'total_s' (own time) and 'cumulative_s'.
+    """
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'total_s': total,
+            'cumulative_s': cumulative,
+        })
+    rows.sort(key=lambda row: row['cumulative_s'], reverse=True)
+    return rows[:limit]
+
+
+class ProfileStore:
+    """
+    Folder of upload profiles (`<id>.prof` + `<id>.json`), newest kept.
+    """
+
+    def __init__(self, folder, keep=50):
+        """
+        Parameters
+        ----------
+        folder : str
+            Folder of the profiles (created when the first one is saved).
+        keep : int, optional
+            Maximum number of stored profiles. Default is 50.
+        """
+        self.folder = folder
+        self.keep = keep
+
+    def save(self, profiler, metadata):
+        """
+        Stop a profiler and store its profile with the given metadata.
+
+        Parameters
+        ----------
+        profiler : cProfile.Profile
+            Profiler returned by `start_profiler`.
+        metadata : dict
+            JSON-serializable description of the upload (dimensions, stage
+            timings, ...).
+
+        Returns
+        -------
+        str
+            Id of the stored profile.
+        """
+        profiler.disable()
+        os.makedirs(self.folder, exist_ok=True)
+
+        profile_id = uuid.uuid4().hex
+        profile_path = os.path.join(self.folder, f"{profile_id}.prof")
+        profiler.dump_stats(profile_path)
+
+        stats = pstats.Stats(profile_path)
+        metadata = {
+            'id': profile_id,
+            'created': datetime.now().isoformat(timespec='milliseconds'),
+            **metadata,
+            'profile_seconds': stats.total_tt,
+            'top_functions': top_functions(stats),
+        }
+        with open(os.path.join(self.folder, f"{profile_id}.json"), 'w') as f:
+            json.dump(metadata, f, indent=2, default=str)
+
+        self.prune()
+        return profile_id
+
+    def list(self, limit=None):
+        """
+        Metadata of the stored profiles, newest first.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of profiles. Default = all.
+
+        Returns
+        -------
+        list of dict
+            The metadata saved with each profile.
+        """
+        if not os.path.isdir(self.folder):
+            return []
+        profiles = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.folder, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue   # Being written or pruned concurrently
+        profiles.sort(key=lambda profile: profile.get('created', ''), reverse=True)
+        return profiles[:limit]
+
+    def path(self, profile_id):
+        """
+        Path of the `.prof` file of a profile.
+
+        Parameters
+        ----------
+        profile_id : str
+            Profile id.
+
+        Returns
+        -------
+        str or None
+            The file path, or None for an unknown or malformed id.
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            return None
+        path = os.path.join(self.folder, f"{profile_id}.prof")
+        return path if os.path.exists(path) else None
+
+    def stats_text(self, profile_id, limit=30, sort='cumulative'):
+        """
+        `pstats` report of a profile.
+
+        Parameters
+        ----------
+        profile_id : str
+            Profile id.
+        limit : int, optional
+            Number of functions listed. Default is 30.
+        sort : str, optional
+            `pstats` sort key. Default is 'cumulative'.
+
+        Returns
+        -------
+        str or None
+            The report, or None for an unknown profile.
+        """
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        pstats.Stats(path, stream=output).strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def prune(self):
+        """
+        Delete the oldest profiles beyond `keep`.
+        """
+        for profile in self.list()[self.keep:]:
+            for extension in ('.prof', '.json'):
+                try:
+                    os.remove(os.path.join(self.folder, f"{profile['id']}{extension}"))
+                except OSError:
+                    pass
@@ -0,0 +1,146 @@
+"""
+============================================
+📌 Content-Addressed Result Cache (Python)
+============================================
+
+Description:
+------------
+This program caches the outcome of the upload pipeline (features,
+prediction and artifact paths) by the content of the uploaded file. The key
+combines the SHA-256 of the uploaded bytes with the pipeline version and the
+SHA-256 of the model file, so a cached result is only reused when the same
+bytes would be processed by the same code and the same model. Re-uploading
+an identical image then skips segmentation, extraction and prediction.
+
+The cache lives in memory (one per process) and is bounded: when it is full
+the least recently used result is evicted.
+
+Features:
+---------
+✅ Keys from the uploaded bytes + pipeline version + model hash
+✅ Size-bounded LRU eviction
+✅ Thread-safe get / put / invalidate
+✅ Hit and miss counters
+
+Usage:
+------
+1. Create a cache: `cache = ResultCache(max_entries=256)`.
+2. Build the key of an upload: `key = upload_cache_key(data, model_sha256)`.
+3. `cache.get(key)` returns the stored result or None; `cache.put(key, result)`
+   stores a new one.
+
+Example:
+--------
+cache = ResultCache(max_entries=2)
+key = upload_cache_key(open("upload.png", "rb").read(), model_registry.sha256)
+if cache.get(key) is None:
+    cache.put(key, {'prediction': "normal"})
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from model.pipeline import PIPELINE_VERSION
+
+
+def upload_cache_key(data, model_sha256, pipeline_version=PIPELINE_VERSION):
+    """
+    Build the cache key of an upload.
+
+    Parameters
+    ----------
+    data : bytes
+        The uploaded file content.
+    model_sha256 : str
+        SHA-256 of the model file (see `ModelRegistry.sha256`).
+    pipeline_version : str, optional
+        Version of the processing pipeline. Default = `PIPELINE_VERSION`.
+
+    Returns
+    -------
+    str
+        Key identifying the result of processing `data`.
+    """
+    return f"{hashlib.sha256(data).hexdigest()}:{pipeline_version}:{model_sha256}"
+
+
+class ResultCache:
+    """
+    Size-bounded, least-recently-used cache of pipeline results.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Create an empty cache.
+
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of results kept (0 disables the cache).
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get the result stored under `key` and mark it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (see `upload_cache_key`).
+
+        Returns
+        -------
+        object or None
+            The stored result, or None on a miss.
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """
+        Store a result, evicting the least recently used one when full.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (see `upload_cache_key`).
+        result : object
+            Result to store.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove the result stored under `key` (if any).
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -21,7 +21,7 @@ Features:
 Usage:
 ------
 1. Provide the path to an image file (in RGB format).
-2. Call `get_rgb_color_moment_features(image_path)` to extract the features.
+2. Call `get_rgb_color_moment_features(image)` to extract the features.
 3. Use `get_rgb_color_moment_feature_names()` to get the names of the features.
 
 Example:
@@ -38,19 +38,30 @@ Author: Fillipus Aditya Nugroho
 """
 
 import numpy as np
-from scipy.stats import skew
-from PIL import Image
+from model.moment_statistics import channel_moments, tiled_channel_moments
+from model.image_context import as_image_context
 
+# Temporary bytes per pixel of a stripe in tiled mode (channel copy + bincount input)
+RGB_BYTES_PER_PIXEL = 16
 
-def get_rgb_color_moment_features(image_path):
+
+def get_rgb_color_moment_features(image, features=None, memory_budget=None):
     """
     Extract first three color moments (mean, standard deviation, skewness)
     for each channel in the RGB color space.
 
     Parameters
     ----------
-    image_path : str
-        Path to the input image file.
+    image : str, numpy.ndarray or ImageContext
+        Path to the input image, an already-decoded BGR array, or a shared
+        image context.
+    features : list of str, optional
+        Subset of `get_rgb_color_moment_feature_names()` to compute, in the
+        desired order. Default = all features.
+    memory_budget : int, optional
+        If given, the channels are histogrammed in row stripes whose
+        temporary arrays stay below this many bytes (same results).
+        Default = whole image at once.
 
     Returns
     -------
@@ -65,33 +76,41 @@ def get_rgb_color_moment_features(image_path):
     ValueError
         If the provided image is not in RGB format.
     """
-    # Open image using PIL
-    image = Image.open(image_path)
-
-    # Convert image to numpy array
-    image_array = np.array(image)
+    # Decoded RGB image array
+    context = as_image_context(image)
+    image_array = context.rgb
 
     # Ensure the image has 3 channels (RGB)
     if len(image_array.shape) < 3 or image_array.shape[2] != 3:
-        raise ValueError(f"Image at {image_path} is not in RGB format.")
-
-    # Calculate mean for each channel
-    mean_r = np.mean(image_array[:, :, 0])
-    mean_g = np.mean(image_array[:, :, 1])
-    mean_b = np.mean(image_array[:, :, 2])
-
-    # Calculate standard deviation for each channel
-    std_r = np.std(image_array[:, :, 0])
-    std_g = np.std(image_array[:, :, 1])
-    std_b = np.std(image_array[:, :, 2])
-
-    # Calculate skewness for each channel
-    skew_r = skew(image_array[:, :, 0].flatten())
-    skew_g = skew(image_array[:, :, 1].flatten())
-    skew_b = skew(image_array[:, :, 2].flatten())
-
-    # Return list of features in order
-    return [mean_r, mean_g, mean_b, std_r, std_g, std_b, skew_r, skew_g, skew_b]
+        raise ValueError(f"Image at {context.path} is not in RGB format.")
+
+    if features is None:
+        features = get_rgb_color_moment_feature_names()
+
+    if memory_budget is not None:
+        # Per-stripe histograms merged into the same exact statistics
+        requested = {name.split('_')[1] for name in features}
+        moments = tiled_channel_moments(
+            image_array, {channel: 'rgb'.index(channel) for channel in requested},
+            RGB_BYTES_PER_PIXEL, memory_budget,
+        )
+        return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
+
+    # Color moments per channel, computed only for the requested features
+    channels = {
+        'r': image_array[:, :, 0],
+        'g': image_array[:, :, 1],
+        'b': image_array[:, :, 2],
+    }
+    moments = {}
+    for name in features:
+        channel = name.split('_')[1]
+        if channel not in moments:
+            # Mean, standard deviation and skewness from one pass over the channel
+            moments[channel] = channel_moments(channels[channel])
+
+    # Return the features in the requested order
+    return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
 
 
 def get_rgb_color_moment_feature_names():
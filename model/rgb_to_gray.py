@@ -20,8 +20,9 @@ Features:
 
 Usage:
 ------
-1. Provide the path of the input image (e.g., "sample_image.jpg").
-2. Call the function `rgb_to_gray_converter(image_path)`.
+1. Provide the path of the input image (e.g., "sample_image.jpg"), or an
+   image already decoded with OpenCV.
+2. Call the function `rgb_to_gray_converter(image)`.
 3. The function returns the grayscale image as a numpy array.
 
 Example:
@@ -35,6 +36,7 @@ Author: Fillipus Aditya Nugroho
 """
 
 import cv2
+import numpy as np
 
 def rgb_to_gray_converter(image):
     """
@@ -42,15 +44,17 @@ def rgb_to_gray_converter(image):
 
     Parameters
     ----------
-    image : str
-        Path to the input RGB image file.
+    image : str or numpy.ndarray
+        Path to the input RGB image file, or an already-decoded BGR image
+        (as returned by `cv2.imread`).
 
     Returns
     -------
     gray_image : numpy.ndarray
         The converted grayscale image.
     """
-    image = cv2.imread(image)
+    if not isinstance(image, np.ndarray):
+        image = cv2.imread(image)
     gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     
     return gray_image
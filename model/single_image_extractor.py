@@ -22,13 +22,32 @@ Features:
 ✅ Flexible selection of feature types (color spaces and texture methods)  
 ✅ Outputs results as a clean Pandas DataFrame  
 ✅ Automatically removes constant-valued columns  
+✅ Decodes the image once and shares it across all extractors  
+✅ Extraction planner: given the feature names a model needs, runs only the
+   extractors, directions and statistics required to produce them  
+✅ Optional concurrent execution of the feature families (thread or process
+   pool, configurable worker count), merged in the canonical column order  
+✅ Optional separate image for the texture families (e.g. cropped to the
+   region of interest, see `roi_crop.py`)  
+✅ Optional tiled mode for very large images: every family works on row
+   stripes / chunks whose temporary arrays stay under a memory budget  
+✅ Optional per-family timings (`timings=StageTimings()`, see `metrics.py`)  
 
 Usage:
 ------
 1. Import the `SingleImageFeatureExtractor` class.
 2. Initialize the extractor: `extractor = SingleImageFeatureExtractor()`.
 3. Call `extractor.extract_features(image_path)` with the path to the input image.
-4. (Optional) Specify desired color spaces or texture feature sets.
+4. (Optional) Specify desired color spaces or texture feature sets, or pass
+   `feature_names=get_model_feature_names(model)` to extract exactly the
+   columns a model expects, in its order.
+5. (Optional) Run the families concurrently:
+   `SingleImageFeatureExtractor(executor='thread', max_workers=4)`.
+   Threads suit the NumPy/OpenCV-heavy families (they release the GIL);
+   'process' also parallelizes the pure-Python parts at the cost of
+   copying the image to each worker.
+6. (Optional) Bound the temporary memory of each family on large images:
+   `SingleImageFeatureExtractor(memory_budget=256 * 2**20)`.
 
 Example:
 --------
@@ -41,8 +60,15 @@ Author: Fillipus Aditya Nugroho
 ============================================
 """
 
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
 import pandas as pd
 
+from model.image_context import as_image_context
+
 # Import all feature extraction functions & name getters
 from model.rgb_color_moment import get_rgb_color_moment_features, get_rgb_color_moment_feature_names
 from model.yuv_color_moment import get_yuv_color_moment_features, get_yuv_color_moment_feature_names
@@ -52,18 +78,76 @@ from model.tamura_feature_extraction import get_tamura_features, get_tamura_feat
 from model.lbp_feature_extraction import get_lbp_features, get_lbp_feature_names
 
 
+def get_model_feature_names(model):
+    """
+    Get the feature names a fitted model expects, in its expected order.
+
+    Parameters
+    ----------
+    model : object
+        Fitted XGBoost model (uses its booster's feature names) or any
+        scikit-learn estimator fitted on a DataFrame (`feature_names_in_`).
+
+    Returns
+    -------
+    list of str
+        Feature names in the order the model expects them.
+    """
+    if hasattr(model, 'get_booster'):
+        feature_names = model.get_booster().feature_names
+        if feature_names:
+            return list(feature_names)
+    if hasattr(model, 'feature_names_in_'):
+        return list(model.feature_names_in_)
+    raise ValueError("The model does not record the feature names it was trained on.")
+
+
+def _timed_family(get_features, image, kwargs):
+    # Runs in the worker (thread or process), so queueing is not counted
+    start = time.perf_counter()
+    result = get_features(image, **kwargs)
+    return result, time.perf_counter() - start
+
+
 class SingleImageFeatureExtractor:
     """
     Extract multiple color moment and texture features
     for a single input image (website use case).
     """
 
-    def __init__(self):
-        # Mapping for color moment features
+    def __init__(self, executor=None, max_workers=None, memory_budget=None):
+        """
+        Parameters
+        ----------
+        executor : {None, 'thread', 'process'} or concurrent.futures.Executor, optional
+            How to run the feature families: one after another (None,
+            default), concurrently in a thread pool or a process pool
+            (created on first use), or in a given executor.
+        max_workers : int, optional
+            Worker count of the created pool. Default = one per family
+            (at most 6) for threads, the CPU count for processes.
+        memory_budget : int, optional
+            Maximum bytes of temporary arrays per family: the image is then
+            processed in row stripes (or, for GLRLM, chunks of whole runs)
+            and the partial histograms / moments / run counts are merged.
+            The decoded image itself is not counted, and concurrent families
+            each get this budget. Texture features are identical; float
+            color moments (YUV, LAB) match up to rounding. Default = whole
+            image at once.
+        """
+        if executor not in (None, 'thread', 'process') and not isinstance(executor, Executor):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.executor = executor
+        self.max_workers = max_workers
+        self._executor = executor if isinstance(executor, Executor) else None
+        self.memory_budget = memory_budget
+
+        # Mapping for color moment features (LAB through the 8-bit sRGB lookup
+        # table, which gives the same values as the plain conversion)
         self.color_moment_features = {
             'RGB': (get_rgb_color_moment_features, get_rgb_color_moment_feature_names),
             'YUV': (get_yuv_color_moment_features, get_yuv_color_moment_feature_names),
-            'LAB': (get_lab_color_moment_features, get_lab_color_moment_feature_names),
+            'LAB': (partial(get_lab_color_moment_features, use_lut=True), get_lab_color_moment_feature_names),
         }
 
         # Mapping for texture features
@@ -73,46 +157,201 @@ class SingleImageFeatureExtractor:
             'LBP': (get_lbp_features, get_lbp_feature_names),
         }
 
-    def extract_features(self, image_path, color_spaces=None, texture_features=None):
+        # Mapping from feature name to the family (key above) producing it.
+        # 'mean_b', 'std_b' and 'skew_b' exist in both RGB and LAB; the first
+        # registered family (RGB) wins.
+        self.feature_families = {}
+        for key, (_, get_names) in {**self.color_moment_features, **self.texture_features}.items():
+            for name in get_names():
+                self.feature_families.setdefault(name, key)
+
+    def _get_executor(self):
+        if self._executor is None and self.executor == 'thread':
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers or 6, thread_name_prefix="feature-family"
+            )
+        elif self._executor is None and self.executor == 'process':
+            # 'spawn': forked children of a threaded process (OpenCV, web
+            # server) can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def close(self):
+        """
+        Shut down the pool created by this extractor (if any).
+        """
+        if self._executor is not None and not isinstance(self.executor, Executor):
+            self._executor.shutdown()
+            self._executor = None
+
+    def _run_families(self, tasks, timings=None):
+        """
+        Run feature family extractors, concurrently if an executor is set.
+
+        Parameters
+        ----------
+        tasks : list of (str, callable, ImageContext, dict)
+            Family key, `get_*_features` function, the image context it runs
+            on and its keyword arguments.
+        timings : StageTimings, optional
+            Receives the duration of every family as stage 'feature_<key>'.
+
+        Returns
+        -------
+        list
+            The result of each task, in the order of `tasks`.
+        """
+        executor = self._get_executor()
+        if executor is None or len(tasks) < 2:
+            outcomes = [_timed_family(get_features, image, kwargs) for _, get_features, image, kwargs in tasks]
+        else:
+            # Decode before sharing the contexts, so workers don't each read the file
+            for _, _, image, _ in tasks:
+                image.load()
+            futures = [executor.submit(_timed_family, get_features, image, kwargs)
+                       for _, get_features, image, kwargs in tasks]
+            outcomes = [future.result() for future in futures]
+
+        if timings is not None:
+            for (key, _, _, _), (_, seconds) in zip(tasks, outcomes):
+                timings.add(f"feature_{key}", seconds)
+        return [result for result, _ in outcomes]
+
+    def _family_kwargs(self, **kwargs):
+        if self.memory_budget is not None:
+            kwargs['memory_budget'] = self.memory_budget
+        return kwargs
+
+    def _family_image(self, key, image, texture_image):
+        if texture_image is not None and key in self.texture_features:
+            return texture_image
+        return image
+
+    def plan_extraction(self, feature_names):
+        """
+        Group the required feature names by the extractor that produces them.
+
+        Parameters
+        ----------
+        feature_names : list of str
+            Names of the features to produce (e.g. from
+            `get_model_feature_names(model)`).
+
+        Returns
+        -------
+        dict
+            Mapping of family key (e.g. 'YUV', 'GLRLM') to the list of
+            feature names it has to compute. Families that are not needed
+            are absent.
+        """
+        plan = {}
+        for name in feature_names:
+            if name not in self.feature_families:
+                raise ValueError(f"Unknown feature name: {name}")
+            plan.setdefault(self.feature_families[name], []).append(name)
+        return plan
+
+    def extract_planned_features(self, image, feature_names, texture_image=None, timings=None):
+        """
+        Extract exactly the given features, running only what they need.
+
+        Parameters
+        ----------
+        image : str, numpy.ndarray or ImageContext
+            Path to the segmented input image, an already-decoded BGR array,
+            or a shared image context.
+        feature_names : list of str
+            Names of the features to produce.
+        texture_image : str, numpy.ndarray or ImageContext, optional
+            Image for the texture families (GLRLM, TAMURA, LBP), e.g. the
+            segmented image cropped to its region of interest. Default = `image`.
+        timings : StageTimings, optional
+            Receives the duration of every family run.
+
+        Returns
+        -------
+        df_features : pd.DataFrame
+            One row with the requested features as columns, in the given order.
+        """
+        image = as_image_context(image)
+        if texture_image is not None:
+            texture_image = as_image_context(texture_image)
+        extractors = {**self.color_moment_features, **self.texture_features}
+
+        plan = self.plan_extraction(feature_names)
+        tasks = [
+            (key, extractors[key][0], self._family_image(key, image, texture_image),
+             self._family_kwargs(features=names))
+            for key, names in plan.items()
+        ]
+
+        values = {}
+        for names, results in zip(plan.values(), self._run_families(tasks, timings)):
+            values.update(zip(names, results))
+
+        return pd.DataFrame([[values[name] for name in feature_names]], columns=list(feature_names))
+
+    def extract_features(self, image_path, color_spaces=None, texture_features=None, feature_names=None,
+                         texture_image=None, timings=None):
         """
         Extract specified features for a single image.
 
+        The image is decoded once into an `ImageContext` that is shared by
+        every extractor, so each color conversion happens at most once.
+
         Parameters
         ----------
-        image_path : str
-            Path to the segmented input image.
+        image_path : str, numpy.ndarray or ImageContext
+            Path to the segmented input image, an already-decoded BGR array,
+            or a shared image context.
         color_spaces : list of str, optional
             Options: ['RGB', 'YUV', 'LAB']. Default = all.
         texture_features : list of str, optional
             Options: ['LBP', 'GLRLM', 'TAMURA']. 
             Default = ['LBP', 'GLRLM', 'TAMURA'].
+        feature_names : list of str, optional
+            If given, extract exactly these features (see
+            `extract_planned_features`); `color_spaces` and
+            `texture_features` are then ignored.
+        texture_image : str, numpy.ndarray or ImageContext, optional
+            Image for the texture families (e.g. cropped to the region of
+            interest). Default = `image_path`.
+        timings : StageTimings, optional
+            Receives the duration of every family run (stage 'feature_<key>').
 
         Returns
         -------
         df_features : pd.DataFrame
             Extracted features in a DataFrame (1 row).
         """
+        if feature_names is not None:
+            return self.extract_planned_features(image_path, feature_names, texture_image, timings)
+
         if color_spaces is None:
             color_spaces = ['RGB', 'YUV', 'LAB']
         if texture_features is None:
             texture_features = ['LBP', 'GLRLM', 'TAMURA']
 
+        # Decode once and share the arrays with every extractor
+        image = as_image_context(image_path)
+        if texture_image is not None:
+            texture_image = as_image_context(texture_image)
+
+        # Color moment features first, then texture features
+        families = [(key, self.color_moment_features[key]) for key in color_spaces if key in self.color_moment_features]
+        families += [(key, self.texture_features[key]) for key in texture_features if key in self.texture_features]
+
         features = []
         features_name = []
-
-        # Extract color moment features
-        for key in color_spaces:
-            if key in self.color_moment_features:
-                get_features, get_names = self.color_moment_features[key]
-                features.extend(get_features(image_path))
-                features_name.extend(get_names())
-
-        # Extract texture features
-        for key in texture_features:
-            if key in self.texture_features:
-                get_features, get_names = self.texture_features[key]
-                features.extend(get_features(image_path))
-                features_name.extend(get_names())
+        results = self._run_families([
+            (key, get_features, self._family_image(key, image, texture_image), self._family_kwargs())
+            for key, (get_features, _) in families
+        ], timings)
+        for (_, (_, get_names)), result in zip(families, results):
+            features.extend(result)
+            features_name.extend(get_names())
 
         # Convert to DataFrame
         df_features = pd.DataFrame([features], columns=features_name)
@@ -20,13 +20,17 @@ Features:
 ---------
 ✅ Computes coarseness, contrast, directionality, and roughness
 ✅ Implements Tamura’s original texture feature formulas
+✅ Coarseness uses summed-area tables with bounded memory
+✅ Directionality uses whole-array gradients and a single histogram pass
+✅ Optional tiled mode: every measure runs on row stripes (with halo rows
+   for the windows and gradients) under a memory budget, identical results
 ✅ Works with grayscale images (converts automatically from RGB if needed)
 ✅ Provides helper function for feature names
 
 Usage:
 ------
 1. Provide the path to an image file.
-2. Call `get_tamura_features(image_path)` to extract the features.
+2. Call `get_tamura_features(image)` with the path (or an ImageContext).
 3. Use `get_tamura_feature_names()` to get the ordered feature names.
 
 Example:
@@ -42,22 +46,137 @@ Author: Fillipus Aditya Nugroho
 ============================================
 """
 
-import cv2
 import numpy as np
+from model.image_context import as_image_context
+from model.moment_statistics import channel_moments, MomentAccumulator
+from model.tiling import row_tiles
 
+# Temporary bytes per pixel of a stripe in tiled mode
+COARSENESS_BYTES_PER_PIXEL = 80       # summed-area table, window sums, differences, best scales
+DIRECTIONALITY_BYTES_PER_PIXEL = 96   # int64 copy, box sums, gradients, orientation, bins
+CONTRAST_BYTES_PER_PIXEL = 16         # bincount input
 
-def coarseness(image, kmax):
+
+def coarseness_scales(image, kmax, start=0, stop=None):
+    """
+    Best window scale index of every pixel in rows `start:stop`.
+
+    The window sums around a pixel reach up to `2 ** kmax` rows away (two
+    windows of the largest scale), so only those halo rows around the
+    stripe are read. Which pixels have a window sum / difference at all
+    depends on their position in the whole image, as in `coarseness`.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Input grayscale image.
+    kmax : int
+        Number of scales (already limited to the image size).
+    start, stop : int, optional
+        Rows to compute. Default = all rows.
+
+    Returns
+    -------
+    numpy.ndarray
+        Scale index (0 .. kmax - 1) of rows `start:stop`.
+    """
+    w, h = image.shape
+    if stop is None:
+        stop = w
+
+    # Halo rows read around the stripe
+    halo = np.power(2, kmax)
+    top = max(start - halo, 0)
+    bottom = min(stop + halo, w)
+    rows_out = stop - start
+
+    # Summed-area table of the block: integral[i, j] = sum(block[:i, :j])
+    integral = np.zeros([bottom - top + 1, h + 1], dtype=np.int64)
+    integral[1:, 1:] = np.cumsum(np.cumsum(image[top:bottom], axis=0, dtype=np.int64), axis=1)
+
+    h_max = np.zeros([rows_out, h])                     # Best horizontal difference so far
+    v_max = np.zeros([rows_out, h])                     # Best vertical difference so far
+    h_index = np.zeros([rows_out, h], dtype=np.int64)   # Scale of the best horizontal difference
+    v_index = np.zeros([rows_out, h], dtype=np.int64)   # Scale of the best vertical difference
+
+    for k in range(kmax):
+        window = np.power(2, k)
+        average_gray = np.zeros([bottom - top, h])  # Local window sums of the block rows
+        horizon = np.zeros([rows_out, h])           # Horizontal differences for this scale
+        vertical = np.zeros([rows_out, h])          # Vertical differences for this scale
+
+        # Window sums over image[wi - window:wi + window, hi - window:hi + window],
+        # for the image rows window <= wi < w - window whose window lies in the block
+        first = top + window
+        last = min(w - window, bottom - window + 1)
+        if w - window > window and h - window > window and last > first:
+            i0, i1 = first - top, last - top
+            average_gray[i0:i1, window:h - window] = (
+                integral[i0 + window:i1 + window, 2 * window:h]
+                - integral[i0 - window:i1 - window, 2 * window:h]
+                - integral[i0 + window:i1 + window, 0:h - 2 * window]
+                + integral[i0 - window:i1 - window, 0:h - 2 * window]
+            )
+
+        # Horizontal and vertical differences of the image rows
+        # window <= wi < w - window - 1 inside the stripe
+        first = max(start, window)
+        last = min(stop, w - window - 1)
+        if w - window - 1 > window and h - window - 1 > window and last > first:
+            rows = slice(first - start, last - start)
+            block_rows = slice(first - top, last - top)
+            cols = slice(window, h - window - 1)
+            horizon[rows, cols] = (
+                average_gray[first - top + window:last - top + window, cols]
+                - average_gray[first - top - window:last - top - window, cols]
+            )
+            vertical[rows, cols] = (
+                average_gray[block_rows, 2 * window:h - 1] - average_gray[block_rows, 0:h - 2 * window - 1]
+            )
+
+        # Normalize differences
+        horizon *= (1.0 / np.power(2, 2 * (k + 1)))
+        vertical *= (1.0 / np.power(2, 2 * (k + 1)))
+
+        # Keep the first scale reaching the maximum (same as np.argmax)
+        if k == 0:
+            h_max, v_max = horizon, vertical
+            continue
+        better = horizon > h_max
+        h_max = np.where(better, horizon, h_max)
+        h_index[better] = k
+        better = vertical > v_max
+        v_max = np.where(better, vertical, v_max)
+        v_index[better] = k
+
+    # Select best window size per pixel based on maximum difference
+    return np.where(h_max > v_max, h_index, v_index)
+
+
+def coarseness(image, kmax, memory_budget=None):
     """
     Calculate the coarseness feature of an image based on Tamura's texture features.
 
     Coarseness measures the granularity or scale of the texture patterns.
 
+    Window sums are read from a summed-area table and the differences are
+    taken with whole-array slicing, one scale at a time. Only the running
+    best difference and its scale index are kept per pixel, so memory stays
+    at a handful of `w × h` arrays instead of three `kmax × w × h` cubes.
+    Every intermediate is an integer or an integer scaled by a power of two,
+    so the result is identical (tolerance 0) to the per-pixel loop version.
+    With a memory budget the rows are processed in stripes (see
+    `coarseness_scales`); the best scales are powers of two, so their sum
+    and the result are still exact.
+
     Parameters
     ----------
     image : numpy.ndarray
         Input grayscale image.
     kmax : int
         Maximum window size exponent for local averaging.
+    memory_budget : int, optional
+        Maximum bytes of temporary arrays per stripe. Default = one stripe.
 
     Returns
     -------
@@ -71,41 +190,18 @@ def coarseness(image, kmax):
     kmax = kmax if (np.power(2, kmax) < w) else int(np.log(w) / np.log(2))
     kmax = kmax if (np.power(2, kmax) < h) else int(np.log(h) / np.log(2))
 
-    average_gray = np.zeros([kmax, w, h])  # Local mean gray level
-    horizon = np.zeros([kmax, w, h])       # Horizontal differences
-    vertical = np.zeros([kmax, w, h])      # Vertical differences
-    Sbest = np.zeros([w, h])               # Best window size for each pixel
+    # Sum of the best window sizes, stripe by stripe
+    total = 0.0
+    for start, stop in row_tiles(image.shape, COARSENESS_BYTES_PER_PIXEL, memory_budget,
+                                 halo=np.power(2, kmax)):
+        Sbest = np.power(2.0, coarseness_scales(image, kmax, start, stop))
+        total += np.sum(Sbest)
 
-    for k in range(kmax):
-        window = np.power(2, k)
-        # Calculate local averages
-        for wi in range(window, w - window):
-            for hi in range(window, h - window):
-                average_gray[k][wi][hi] = np.sum(image[wi - window:wi + window, hi - window:hi + window])
-        # Calculate horizontal and vertical differences
-        for wi in range(window, w - window - 1):
-            for hi in range(window, h - window - 1):
-                horizon[k][wi][hi] = average_gray[k][wi + window][hi] - average_gray[k][wi - window][hi]
-                vertical[k][wi][hi] = average_gray[k][wi][hi + window] - average_gray[k][wi][hi - window]
-        # Normalize differences
-        horizon[k] *= (1.0 / np.power(2, 2 * (k + 1)))
-        vertical[k] *= (1.0 / np.power(2, 2 * (k + 1)))
-
-    # Select best window size per pixel based on maximum difference
-    for wi in range(w):
-        for hi in range(h):
-            h_max = np.max(horizon[:, wi, hi])
-            h_max_index = np.argmax(horizon[:, wi, hi])
-            v_max = np.max(vertical[:, wi, hi])
-            v_max_index = np.argmax(vertical[:, wi, hi])
-            index = h_max_index if (h_max > v_max) else v_max_index
-            Sbest[wi][hi] = np.power(2, index)
-
-    fcrs = np.mean(Sbest)
+    fcrs = total / (w * h)
     return fcrs
 
 
-def contrast(image):
+def contrast(image, memory_budget=None):
     """
     Calculate the contrast feature of an image based on Tamura's texture features.
 
@@ -115,99 +211,165 @@ def contrast(image):
     ----------
     image : numpy.ndarray
         Input grayscale image.
+    memory_budget : int, optional
+        Maximum bytes of temporary arrays per stripe. Default = one stripe.
 
     Returns
     -------
     float
         Contrast value.
     """
-    image = np.array(image)
-    image = np.reshape(image, (1, image.shape[0] * image.shape[1]))
-    m4 = np.mean(np.power(image - np.mean(image), 4))  # Fourth moment
-    v = np.var(image)                                  # Variance
+    image = np.asarray(image)
+    if memory_budget is None:
+        stats = channel_moments(image)                 # One histogram pass for 8-bit images
+    else:
+        accumulator = MomentAccumulator()              # Histograms merged stripe by stripe
+        for start, stop in row_tiles(image.shape, CONTRAST_BYTES_PER_PIXEL, memory_budget):
+            accumulator.add(image[start:stop])
+        stats = accumulator.result()
+    m4 = stats['m4']                                   # Fourth moment
+    v = stats['var']                                   # Variance
     std = np.sqrt(v)                                   # Standard deviation
     alfa4 = m4 / np.power(v, 2)                        # Normalized fourth moment
     fcon = std / np.power(alfa4, 0.25)                 # Tamura contrast
     return fcon
 
 
-def directionality(image):
+def prewitt_gradients(image, start=0, stop=None):
     """
-    Calculate the directionality feature of an image based on Tamura's texture features.
+    Prewitt-like horizontal and vertical gradients of rows `start:stop`.
 
-    Directionality measures the degree of orientation and alignment of patterns.
+    Only the row above and below the stripe are read. The first and last
+    image rows and columns use one-sided differences, as in `directionality`.
 
     Parameters
     ----------
     image : numpy.ndarray
-        Input grayscale image.
+        Input grayscale image (int64).
+    start, stop : int, optional
+        Rows to compute. Default = all rows.
 
     Returns
     -------
-    float
-        Directionality value.
+    deltaH, deltaV : numpy.ndarray
+        Horizontal and vertical gradients of rows `start:stop`.
     """
-    image = np.array(image, dtype='int64')
     h, w = image.shape
+    if stop is None:
+        stop = h
+
+    # Prewitt-like kernels for horizontal and vertical gradients:
+    # convH = [[-1, 0, 1], [-1, 0, 1], [-1, 0, 1]]
+    # convV = [[1, 1, 1], [0, 0, 0], [-1, -1, -1]]
+    deltaH = np.zeros([stop - start, w])  # Horizontal gradient
+    deltaV = np.zeros([stop - start, w])  # Vertical gradient
+
+    # Interior image rows 1 .. h - 2 of the stripe, read with one halo row
+    first = max(start, 1)
+    last = min(stop, h - 1)
+    if last > first:
+        rows = slice(first - start, last - start)
+
+        # Compute horizontal gradient (interior): column difference of 3-row sums
+        rows_sum = image[first - 1:last - 1, :] + image[first:last, :] + image[first + 1:last + 1, :]
+        deltaH[rows, 1:w - 1] = rows_sum[:, 2:] - rows_sum[:, :-2]
+
+        # Compute vertical gradient (interior): row difference of 3-column sums
+        block = image[first - 1:last + 1]
+        cols_sum = block[:, :-2] + block[:, 1:-1] + block[:, 2:]
+        deltaV[rows, 1:w - 1] = cols_sum[:-2, :] - cols_sum[2:, :]
+        deltaV[rows, 0] = image[first + 1:last + 1, 0] - image[first:last, 0]
+        deltaV[rows, w - 1] = image[first + 1:last + 1, w - 1] - image[first:last, w - 1]
+
+    # Handle borders: first and last image rows
+    if start == 0:
+        deltaH[0, 1:w - 1] = image[0, 2:] - image[0, 1:w - 1]
+        deltaV[0, :] = image[1, :] - image[0, :]
+    if stop == h:
+        deltaH[h - 1 - start, 1:w - 1] = image[h - 1, 2:] - image[h - 1, 1:w - 1]
+        deltaV[h - 1 - start, :] = image[h - 1, :] - image[h - 2, :]
+
+    # Handle borders: first and last columns of deltaH
+    deltaH[:, 0] = image[start:stop, 1] - image[start:stop, 0]
+    deltaH[:, w - 1] = image[start:stop, w - 1] - image[start:stop, w - 2]
+
+    return deltaH, deltaV
+
+
+def direction_histogram(image, start=0, stop=None, n=16, t=12):
+    """
+    Counts of the gradient directions of rows `start:stop`.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Input grayscale image (int64).
+    start, stop : int, optional
+        Rows to compute. Default = all rows.
+    n : int, optional
+        Number of direction bins. Default is 16.
+    t : int, optional
+        Threshold for the gradient magnitude. Default is 12.
 
-    # Prewitt-like kernels for horizontal and vertical gradients
-    convH = np.array([[-1, 0, 1], [-1, 0, 1], [-1, 0, 1]])
-    convV = np.array([[1, 1, 1], [0, 0, 0], [-1, -1, -1]])
-
-    deltaH = np.zeros([h, w])  # Horizontal gradient
-    deltaV = np.zeros([h, w])  # Vertical gradient
-    theta = np.zeros([h, w])   # Orientation angles
-
-    # Compute horizontal gradient
-    for hi in range(1, h - 1):
-        for wi in range(1, w - 1):
-            deltaH[hi][wi] = np.sum(np.multiply(image[hi - 1:hi + 2, wi - 1:wi + 2], convH))
-    # Handle borders for deltaH
-    for wi in range(1, w - 1):
-        deltaH[0][wi] = image[0][wi + 1] - image[0][wi]
-        deltaH[h - 1][wi] = image[h - 1][wi + 1] - image[h - 1][wi]
-    for hi in range(h):
-        deltaH[hi][0] = image[hi][1] - image[hi][0]
-        deltaH[hi][w - 1] = image[hi][w - 1] - image[hi][w - 2]
-
-    # Compute vertical gradient
-    for hi in range(1, h - 1):
-        for wi in range(1, w - 1):
-            deltaV[hi][wi] = np.sum(np.multiply(image[hi - 1:hi + 2, wi - 1:wi + 2], convV))
-    # Handle borders for deltaV
-    for wi in range(w):
-        deltaV[0][wi] = image[1][wi] - image[0][wi]
-        deltaV[h - 1][wi] = image[h - 1][wi] - image[h - 2][wi]
-    for hi in range(1, h - 1):
-        deltaV[hi][0] = image[hi + 1][0] - image[hi][0]
-        deltaV[hi][w - 1] = image[hi + 1][w - 1] - image[hi][w - 1]
+    Returns
+    -------
+    numpy.ndarray
+        Number of pixels per direction bin (int64).
+    """
+    deltaH, deltaV = prewitt_gradients(image, start, stop)
 
     # Compute gradient magnitude and orientation
     deltaG = (np.abs(deltaH) + np.abs(deltaV)) / 2.0
     deltaG_vec = deltaG.flatten()
 
-    for hi in range(h):
-        for wi in range(w):
-            if deltaH[hi][wi] == 0 and deltaV[hi][wi] == 0:
-                theta[hi][wi] = 0
-            elif deltaH[hi][wi] == 0:
-                theta[hi][wi] = np.pi
-            else:
-                theta[hi][wi] = np.arctan(deltaV[hi][wi] / deltaH[hi][wi]) + np.pi / 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        theta = np.arctan(deltaV / deltaH) + np.pi / 2.0
+    theta[deltaH == 0] = np.pi
+    theta[(deltaH == 0) & (deltaV == 0)] = 0
     theta_vec = theta.flatten()
 
+    # Bin ni covers [(2 * ni - 1) * pi / (2 * n), (2 * ni + 1) * pi / (2 * n))
+    edges = np.array([(2 * ni - 1) * np.pi / (2 * n) for ni in range(n + 1)])
+    bins = np.searchsorted(edges, theta_vec, side='right') - 1
+    valid = (deltaG_vec >= t) & (bins >= 0) & (bins < n)
+    return np.bincount(bins[valid], minlength=n)
+
+
+def directionality(image, memory_budget=None):
+    """
+    Calculate the directionality feature of an image based on Tamura's texture features.
+
+    Directionality measures the degree of orientation and alignment of patterns.
+
+    The Prewitt gradients are computed for the whole image at once (the
+    kernels are separable, so each is a 3-row/3-column box sum followed by a
+    shifted difference), the orientation is computed element-wise, and the
+    direction histogram is built with a single `np.bincount` pass. With a
+    memory budget the rows are processed in stripes and the (integer)
+    histograms are added, which gives the same result.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Input grayscale image.
+    memory_budget : int, optional
+        Maximum bytes of temporary arrays per stripe. Default = one stripe.
+
+    Returns
+    -------
+    float
+        Directionality value.
+    """
+    image = np.array(image, dtype='int64')
+
     # Histogram of directions
     n = 16  # Number of bins
     t = 12  # Threshold for gradient magnitude
-    hd = np.zeros(n)
-    dlen = deltaG_vec.shape[0]
 
-    for ni in range(n):
-        for k in range(dlen):
-            if ((deltaG_vec[k] >= t) and
-                (theta_vec[k] >= (2 * ni - 1) * np.pi / (2 * n)) and
-                (theta_vec[k] < (2 * ni + 1) * np.pi / (2 * n))):
-                hd[ni] += 1
+    hd = np.zeros(n, dtype=np.int64)
+    for start, stop in row_tiles(image.shape, DIRECTIONALITY_BYTES_PER_PIXEL, memory_budget, halo=1):
+        hd += direction_histogram(image, start, stop, n, t)
+    hd = hd.astype(np.float64)
 
     hd /= np.mean(hd)  # Normalize histogram
     hd_max_index = np.argmax(hd)
@@ -240,30 +402,44 @@ def roughness(fcrs, fcon):
     return fcrs + fcon
 
 
-def get_tamura_features(image_path):
+def get_tamura_features(image, features=None, memory_budget=None):
     """
     Extract Tamura texture features (coarseness, contrast, directionality, roughness)
     from a given image.
 
     Parameters
     ----------
-    image_path : str
-        Path to the input image.
+    image : str, numpy.ndarray or ImageContext
+        Path to the input image, an already-decoded BGR array, or a shared
+        image context.
+    features : list of str, optional
+        Subset of `get_tamura_feature_names()` to compute, in the desired
+        order. Only the measures needed for them are run. Default = all.
+    memory_budget : int, optional
+        If given, every measure runs on row stripes whose temporary arrays
+        stay below this many bytes (same results). Default = whole image.
 
     Returns
     -------
     list
         List of feature values in order.
     """
-    img = cv2.imread(image_path)
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    fcrs = coarseness(img, 5)
-    fcon = contrast(img)
-    fdir = directionality(img)
-    frgh = roughness(fcrs, fcon)
-
-    return [fcrs, fcon, fdir, frgh]
+    if features is None:
+        features = get_tamura_feature_names()
+
+    img = as_image_context(image).gray
+    values = {}
+
+    if 'coarseness_tamura' in features or 'roughness_tamura' in features:
+        values['coarseness_tamura'] = coarseness(img, 5, memory_budget)
+    if 'contrast_tamura' in features or 'roughness_tamura' in features:
+        values['contrast_tamura'] = contrast(img, memory_budget)
+    if 'directionality_tamura' in features:
+        values['directionality_tamura'] = directionality(img, memory_budget)
+    if 'roughness_tamura' in features:
+        values['roughness_tamura'] = roughness(values['coarseness_tamura'], values['contrast_tamura'])
+
+    return [values[name] for name in features]
 
 
 def get_tamura_feature_names():
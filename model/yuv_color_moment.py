@@ -13,14 +13,17 @@ where brightness and color variations need to be analyzed independently.
 Features:
 ---------
 ✅ Converts RGB images into YUV color space using a standard transformation matrix  
+✅ Whole-image conversion with a single matrix product (optional float32)  
+✅ Optional tiled mode: converts row stripes under a memory budget and merges
+   their moments (same values up to floating-point rounding)  
 ✅ Extracts first three color moments (mean, standard deviation, skewness)  
-✅ Works on all images that can be opened using Pillow (e.g., .png, .jpg, .jpeg)  
+✅ Works on all images that can be decoded (e.g., .png, .jpg, .jpeg) or an ImageContext  
 ✅ Provides both feature values and corresponding feature names  
 
 Usage:
 ------
 1. Provide the path to the input image file.
-2. Call the `get_yuv_color_moment_features(image_path)` function to extract features.
+2. Call the `get_yuv_color_moment_features(image)` function to extract features.
 3. Use `get_yuv_color_moment_feature_names()` to retrieve the ordered feature labels.
 4. Features can be used for tasks such as image classification, retrieval, or clustering.
 
@@ -36,10 +39,42 @@ Author: Fillipus Aditya Nugroho
 """
 
 import numpy as np
-from scipy.stats import skew
-from PIL import Image
+from model.moment_statistics import channel_moments, tiled_channel_moments
+from model.image_context import as_image_context
 
-def get_yuv_color_moment_features(image_path):
+# RGB to YUV standard conversion matrix
+YUV_MATRIX = np.array([
+    [0.299,  0.587,  0.114],   # Y channel
+    [-0.147, -0.289, 0.436],   # U channel
+    [0.615, -0.515, 0.100]     # V channel
+])
+
+# Temporary bytes per pixel of a float64 stripe in tiled mode (input cast,
+# YUV stripe, channel copy and deviation powers)
+YUV_BYTES_PER_PIXEL = 96
+
+
+def rgb_to_yuv(image_array, dtype=np.float64):
+    """
+    Convert a whole RGB image to the YUV color space with a single matrix product.
+
+    Parameters
+    ----------
+    image_array : numpy.ndarray
+        RGB image with shape (height, width, 3).
+    dtype : numpy dtype, optional
+        Floating-point type of the result. Use `np.float32` to halve the
+        memory of the intermediate image. Default is `np.float64`.
+
+    Returns
+    -------
+    numpy.ndarray
+        YUV image with shape (height, width, 3).
+    """
+    return np.asarray(image_array, dtype=dtype) @ YUV_MATRIX.T.astype(dtype)
+
+
+def get_yuv_color_moment_features(image, dtype=np.float64, features=None, memory_budget=None):
     """
     Extract color moment features from an image in the YUV color space.
 
@@ -49,8 +84,19 @@ def get_yuv_color_moment_features(image_path):
 
     Parameters
     ----------
-    image_path : str
-        Path to the image file.
+    image : str, numpy.ndarray or ImageContext
+        Path to the input image, an already-decoded BGR array, or a shared
+        image context.
+    dtype : numpy dtype, optional
+        Floating-point type used for the YUV image (see `rgb_to_yuv`).
+        Default is `np.float64`.
+    features : list of str, optional
+        Subset of `get_yuv_color_moment_feature_names()` to compute, in the
+        desired order. Default = all features.
+    memory_budget : int, optional
+        If given, the image is converted in row stripes whose temporary
+        arrays stay below this many bytes, and the moments of the stripes
+        are merged. Default = whole image at once.
 
     Returns
     -------
@@ -58,48 +104,39 @@ def get_yuv_color_moment_features(image_path):
         A list containing mean, standard deviation, and skewness for Y, U, and V.
         Order: [mean_y, mean_u, mean_v, std_y, std_u, std_v, skew_y, skew_u, skew_v]
     """
-    # Read the input image using Pillow
-    image = Image.open(image_path)
-    
-    # Convert the image to a numpy array (RGB)
-    image_array = np.array(image)
-    
-    # RGB to YUV standard conversion matrix
-    yuv_matrix = np.array([
-        [0.299,  0.587,  0.114],   # Y channel
-        [-0.147, -0.289, 0.436],   # U channel
-        [0.615, -0.515, 0.100]     # V channel
-    ])
-
-    # Get image dimensions
-    image_shape = image_array.shape
-
-    # Initialize output array to store YUV values
-    yuv_image = np.zeros(image_shape, dtype=np.float64)
-
-    # Perform RGB to YUV conversion pixel by pixel
-    for i in range(image_shape[0]):
-        for j in range(image_shape[1]):
-            # Multiply RGB vector by YUV matrix
-            yuv_image[i, j] = np.dot(yuv_matrix, image_array[i, j])
-
-    # Compute mean of each channel
-    mean_y = np.mean(yuv_image[:, :, 0])
-    mean_u = np.mean(yuv_image[:, :, 1])
-    mean_v = np.mean(yuv_image[:, :, 2])
-
-    # Compute standard deviation of each channel
-    std_y = np.std(yuv_image[:, :, 0])
-    std_u = np.std(yuv_image[:, :, 1])
-    std_v = np.std(yuv_image[:, :, 2])
-
-    # Compute skewness of each channel
-    skew_y = skew(yuv_image[:, :, 0].flatten())
-    skew_u = skew(yuv_image[:, :, 1].flatten())
-    skew_v = skew(yuv_image[:, :, 2].flatten())
-
-    # Return all color moment features as a list
-    return [mean_y, mean_u, mean_v, std_y, std_u, std_v, skew_y, skew_u, skew_v]
+    # Decoded RGB image array
+    image_array = as_image_context(image).rgb
+
+    if features is None:
+        features = get_yuv_color_moment_feature_names()
+
+    if memory_budget is not None:
+        requested = {name.split('_')[1] for name in features}
+        moments = tiled_channel_moments(
+            image_array, {channel: 'yuv'.index(channel) for channel in requested},
+            YUV_BYTES_PER_PIXEL * np.dtype(dtype).itemsize / 8, memory_budget,
+            convert=lambda tile: rgb_to_yuv(tile, dtype),
+        )
+        return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
+
+    # Perform RGB to YUV conversion for the whole image at once
+    yuv_image = rgb_to_yuv(image_array, dtype)
+
+    # Color moments per channel, computed only for the requested features
+    channels = {
+        'y': yuv_image[:, :, 0],
+        'u': yuv_image[:, :, 1],
+        'v': yuv_image[:, :, 2],
+    }
+    moments = {}
+    for name in features:
+        channel = name.split('_')[1]
+        if channel not in moments:
+            # Mean, standard deviation and skewness from one pass over the channel
+            moments[channel] = channel_moments(channels[channel])
+
+    # Return the features in the requested order
+    return [moments[channel][moment] for moment, channel in (name.split('_') for name in features)]
 
 def get_yuv_color_moment_feature_names():
     """
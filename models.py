@@ -0,0 +1,85 @@
+"""
+Documentation for models.py
+===========================
+
+Database models of the CerviScan web application (users, upload history,
+feature schemas and background upload jobs).
+
+The models are bound to the `db` extension object, which is not attached to
+an application here: app.py calls `db.init_app(app)`. Importing this module
+therefore has no side effect (no model loading, no database access), so
+tools such as the history query benchmark can use the table definitions
+against their own database.
+
+Modules and Libraries Used:
+- Flask_SQLAlchemy: ORM for database operations.
+- Flask_Login: `UserMixin` for the user model.
+- model.feature_storage: decoding of the stored feature values.
+"""
+
+from datetime import datetime
+
+from flask_login import UserMixin
+from flask_sqlalchemy import SQLAlchemy
+
+from model.feature_storage import decode_vector, features_frame
+
+# Database extension (initialized by app.py)
+db = SQLAlchemy()
+
+# User model
+class Users(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(250), unique=True, nullable=False)
+    password = db.Column(db.String(250), nullable=False)
+
+# Ordered feature names, stored once per distinct list (referenced by History)
+class FeatureSchema(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False)
+    names = db.Column(db.JSON, nullable=False)
+
+# History model
+class History(db.Model):
+    # Every history query filters by user and orders by date (the id is
+    # implicitly part of every SQLite index, so it also covers the id tie-breaker)
+    __table_args__ = (db.Index('ix_history_user_id_date', 'user_id', 'date'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(250), nullable=False)
+    dob = db.Column(db.String(50), nullable=False)
+    original = db.Column(db.String(250), nullable=False)
+    gray = db.Column(db.String(250), nullable=False)
+    mask = db.Column(db.String(250), nullable=False)
+    segmented = db.Column(db.String(250), nullable=False)
+    # Feature values as little-endian float32, in the order of feature_schema.names
+    # (only loaded when accessed)
+    feature_values = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    feature_schema_id = db.Column(db.Integer, db.ForeignKey('feature_schema.id'), nullable=False)
+    prediction = db.Column(db.String(250), nullable=False)
+    date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    feature_schema = db.relationship(FeatureSchema)
+
+    def feature_vector(self):
+        return decode_vector(self.feature_values)
+
+    def feature_frame(self):
+        return features_frame(self.feature_schema.names, self.feature_values)
+
+# Background upload job model (the History entry is created when the job is done)
+class UploadJob(db.Model):
+    # Pending jobs of a user (history page)
+    __table_args__ = (db.Index('ix_upload_job_user_id_status', 'user_id', 'status'),)
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(250), nullable=False)
+    dob = db.Column(db.String(50), nullable=False)
+    filename = db.Column(db.String(250), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    error = db.Column(db.String(500))
+    history_id = db.Column(db.Integer, db.ForeignKey('history.id'))
+    created = db.Column(db.DateTime, default=datetime.now)
+    updated = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
@@ -0,0 +1,59 @@
+"""
+============================================
+📌 Deterministic Test Images (Python)
+============================================
+
+Description:
+------------
+Small synthetic images shared by the equivalence tests. They are generated
+from fixed seeds, so every run compares the same pixels, and they cover the
+edge cases of the extractors: noise, few gray levels (long runs), flat
+images and single rows.
+
+Usage:
+------
+`from synthetic_images import gray_images` inside a test module.
+
+Author: Fillipus Aditya Nugroho
+============================================
+"""
+
+import cv2
+import numpy as np
+
+
+def gray_images():
+    """Small grayscale images: noise, few gray levels (long runs), flat, single row."""
+    rng = np.random.default_rng(0)
+    return {
+        'noise': rng.integers(0, 256, (23, 31), dtype=np.uint8),
+        'few levels': rng.choice(np.array([10, 60, 61, 200], dtype=np.uint8), (29, 17)),
+        'blocks': np.kron(rng.integers(0, 4, (6, 8)), np.ones((5, 3))).astype(np.uint8) * 50,
+        'flat': np.full((9, 12), 77, dtype=np.uint8),
+        'single row': rng.integers(0, 3, (1, 40), dtype=np.uint8),
+    }
+
+
+def tamura_images():
+    """Images for the Tamura references: random, odd sizes, flat, smaller than the largest window (32)."""
+    rng = np.random.default_rng(1)
+    return {
+        'noise': rng.integers(0, 256, (40, 37), dtype=np.uint8),
+        'odd size': rng.integers(0, 256, (33, 17), dtype=np.uint8),
+        'smooth': np.clip(rng.normal(0, 20, (45, 50)).cumsum(axis=1) + 128, 0, 255).astype(np.uint8),
+        'flat': np.full((20, 20), 128, dtype=np.uint8),
+        'below window': rng.integers(0, 256, (12, 45), dtype=np.uint8),
+        'tiny': rng.integers(0, 256, (3, 5), dtype=np.uint8),
+    }
+
+
+def segmented_image(height=150, width=210, seed=0):
+    """Segmented-like BGR image: a textured elliptic lesion on a black background."""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((height, width, 3), np.uint8)
+    lesion = np.zeros((height, width), np.uint8)
+    cv2.ellipse(lesion, (width // 2, height // 2), (width // 3, height // 3), 20, 0, 360, 255, -1)
+    texture = np.clip(rng.normal((90, 110, 170), 25, (height, width, 3)), 0, 255).astype(np.uint8)
+    texture = cv2.GaussianBlur(texture, (3, 3), 0)
+    image[lesion > 0] = texture[lesion > 0]
+    return image
@@ -0,0 +1,68 @@
+"""
+Equivalence of the run-length-encoding GLRLM with the original builder.
+
+Run with `python -m pytest tests/test_GrayRumatrix.py`.
+"""
+
+from itertools import groupby
+
+import numpy as np
+import pytest
+
+from model.GrayRumatrix import getGrayRumatrix
+from synthetic_images import gray_images
+
+ANGLES = ['deg0', 'deg45', 'deg90', 'deg135']
+
+
+def reference_glrlm(P, theta):
+    """The original GLRLM: `itertools.groupby` over every orientation's pixel sequences."""
+    x, y = P.shape
+    min_pixels = int(np.min(P))
+    num_level = int(np.max(P)) - min_pixels + 1
+    sequences = {
+        'deg0': [row.tolist() for row in P],
+        'deg90': [column.tolist() for column in P.T],
+        'deg45': [P[::-1, :].diagonal(i).tolist() for i in range(-x + 1, y)],
+        'deg135': [np.rot90(P, 3)[::-1, :].diagonal(i).tolist() for i in range(-y + 1, x)],
+    }
+
+    glrlm = np.zeros((num_level, max(x, y), len(theta)))
+    for index, angle in enumerate(theta):
+        for sequence in sequences[angle]:
+            for value, run in groupby(sequence):
+                glrlm[int(value) - min_pixels, len(list(run)) - 1, index] += 1
+    return glrlm
+
+
+@pytest.mark.parametrize('name', list(gray_images()))
+def test_glrlm_matches_groupby_reference(name):
+    image = gray_images()[name]
+    glrlm = getGrayRumatrix().getGrayLevelRumatrix(image, ANGLES)
+    np.testing.assert_array_equal(glrlm, reference_glrlm(image, ANGLES))
+
+
+@pytest.mark.parametrize('theta', [['deg45'], ['deg135', 'deg0']])
+def test_glrlm_angle_subsets_match_groupby_reference(theta):
+    image = gray_images()['few levels']
+    glrlm = getGrayRumatrix().getGrayLevelRumatrix(image, theta)
+    np.testing.assert_array_equal(glrlm, reference_glrlm(image, theta))
+
+
+# Getters in the order of `getGrayRumatrix.FEATURE_NAMES`
+GLRLM_GETTERS = [
+    'getShortRunEmphasis', 'getLongRunEmphasis', 'getGrayLevelNonUniformity',
+    'getRunLengthNonUniformity', 'getRunPercentage', 'getLowGrayLevelRunEmphasis',
+    'getHighGrayLevelRunEmphais', 'getShortRunLowGrayLevelEmphasis',
+    'getShortRunHighGrayLevelEmphasis', 'getLongRunLow', 'getLongRunHighGrayLevelEmphais',
+]
+
+
+@pytest.mark.parametrize('name', ['noise', 'few levels', 'blocks'])
+def test_feature_vector_matches_getters(name):
+    extractor = getGrayRumatrix()
+    glrlm = extractor.getGrayLevelRumatrix(gray_images()[name], ANGLES)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = np.array([np.ravel(getattr(extractor, getter)(glrlm)) for getter in GLRLM_GETTERS])
+    np.testing.assert_allclose(extractor.getFeatureVector(glrlm), expected.T.ravel(), rtol=1e-10)
@@ -0,0 +1,26 @@
+"""
+Equivalence of the LAB lookup-table conversion with the plain skimage path.
+
+Run with `python -m pytest tests/test_lab_color_moment.py`.
+"""
+
+import numpy as np
+
+from model.image_context import ImageContext
+from model.lab_color_moment import get_lab_color_moment_features, rgb_to_lab
+from synthetic_images import segmented_image
+
+
+def test_lookup_table_matches_plain_conversion():
+    image = ImageContext.from_array(segmented_image())
+    # Exact: the extractor uses the table for every upload
+    np.testing.assert_array_equal(rgb_to_lab(image.rgb, use_lut=True), rgb_to_lab(image.rgb))
+    np.testing.assert_array_equal(get_lab_color_moment_features(image, use_lut=True),
+                                  get_lab_color_moment_features(image))
+
+
+def test_lookup_table_covers_every_8_bit_value():
+    # Every value appears in every channel (not every color: 256^3 pixels)
+    red, green = np.meshgrid(np.arange(256), np.arange(256), indexing='ij')
+    rgb = np.stack([red, green, (red + 3 * green) % 256], axis=-1).astype(np.uint8)
+    np.testing.assert_array_equal(rgb_to_lab(rgb, use_lut=True), rgb_to_lab(rgb))
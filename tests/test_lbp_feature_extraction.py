@@ -0,0 +1,23 @@
+"""
+Equivalence of the vectorized LBP encoding with the per-pixel loop.
+
+Run with `python -m pytest tests/test_lbp_feature_extraction.py`.
+"""
+
+import numpy as np
+import pytest
+
+from model.lbp_feature_extraction import lbp_calculated_pixel, lbp_transform
+from synthetic_images import gray_images
+
+
+def per_pixel_lbp(image):
+    """LBP image built with the original `lbp_calculated_pixel` loop."""
+    height, width = image.shape
+    return np.array([[lbp_calculated_pixel(image, x, y) for y in range(width)] for x in range(height)])
+
+
+@pytest.mark.parametrize('name', list(gray_images()))
+def test_lbp_transform_matches_per_pixel_codes(name):
+    image = gray_images()[name]
+    np.testing.assert_array_equal(lbp_transform(image), per_pixel_lbp(image))
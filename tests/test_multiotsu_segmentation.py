@@ -0,0 +1,32 @@
+"""
+Equivalence of the fast Multi-Otsu engine with scikit-image.
+
+Run with `python -m pytest tests/test_multiotsu_segmentation.py`.
+"""
+
+import cv2
+import numpy as np
+import pytest
+from skimage.filters import threshold_multiotsu
+
+from model.multiotsu_segmentation import multiotsu_masking, multiotsu_masking_skimage, multiotsu_thresholds
+from synthetic_images import segmented_image
+
+
+def multiotsu_images():
+    # skimage searches every threshold combination of the min..max bins, which
+    # takes seconds on wide ranges: keep the list short
+    rng = np.random.default_rng(0)
+    return {
+        'uniform noise': rng.integers(0, 256, (300, 400), dtype=np.uint8),
+        'few values': rng.choice(rng.choice(256, 12, replace=False), (300, 400)).astype(np.uint8),
+        'narrow range': rng.integers(90, 140, (300, 400), dtype=np.uint8),
+        'segmented': cv2.cvtColor(segmented_image(), cv2.COLOR_BGR2GRAY),
+    }
+
+
+@pytest.mark.parametrize('name', list(multiotsu_images()))
+def test_multiotsu_matches_skimage(name):
+    image = multiotsu_images()[name]
+    np.testing.assert_array_equal(multiotsu_thresholds(image, classes=5), threshold_multiotsu(image, classes=5))
+    np.testing.assert_array_equal(multiotsu_masking(image), multiotsu_masking_skimage(image))
@@ -0,0 +1,27 @@
+"""
+Equivalence of the pooled feature-family execution with the serial one.
+
+Run with `python -m pytest tests/test_single_image_extractor.py`.
+"""
+
+import numpy as np
+import pytest
+
+from model.single_image_extractor import SingleImageFeatureExtractor
+from synthetic_images import segmented_image
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_pooled_extraction_matches_serial(executor):
+    serial = SingleImageFeatureExtractor()
+    feature_names = list(serial.feature_families)
+    expected = serial.extract_features(segmented_image(), feature_names=feature_names)
+
+    extractor = SingleImageFeatureExtractor(executor=executor, max_workers=2)
+    try:
+        features = extractor.extract_features(segmented_image(), feature_names=feature_names)
+    finally:
+        extractor.close()
+
+    assert list(features.columns) == list(expected.columns)
+    np.testing.assert_array_equal(features.to_numpy(), expected.to_numpy())
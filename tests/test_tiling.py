@@ -0,0 +1,75 @@
+"""
+Equivalence of the tiled (memory budget) extraction with the untiled one.
+
+Run with `python -m pytest tests/test_tiling.py`.
+"""
+
+import numpy as np
+import pytest
+
+from model.GrayRumatrix import getGrayRumatrix
+from model.lbp_feature_extraction import lbp_transform
+from model.single_image_extractor import SingleImageFeatureExtractor
+from model.tamura_feature_extraction import (COARSENESS_BYTES_PER_PIXEL, DIRECTIONALITY_BYTES_PER_PIXEL,
+                                             coarseness, directionality)
+from model.tiling import row_tiles
+from synthetic_images import gray_images, segmented_image, tamura_images
+
+ANGLES = ['deg0', 'deg45', 'deg90', 'deg135']
+
+
+def test_row_tiles_cover_the_image_in_order():
+    tiles = row_tiles((100, 50), 8, 8 * 50 * 30, halo=4)
+    assert tiles[0][0] == 0 and tiles[-1][1] == 100
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(tiles, tiles[1:]))
+    assert row_tiles((100, 50), 8, None) == [(0, 100)]
+
+
+@pytest.mark.parametrize('name', list(gray_images()))
+def test_lbp_stripes_match_whole_image(name):
+    image = gray_images()[name]
+    height = image.shape[0]
+    stripes = [lbp_transform(image, start, min(start + 4, height)) for start in range(0, height, 4)]
+    np.testing.assert_array_equal(np.vstack(stripes), lbp_transform(image))
+
+
+@pytest.mark.parametrize('name', list(gray_images()))
+@pytest.mark.parametrize('chunk_pixels', [1, 50])
+def test_chunked_glrlm_matches_whole_image(name, chunk_pixels):
+    image = gray_images()[name]
+    extractor = getGrayRumatrix()
+    np.testing.assert_array_equal(extractor.getGrayLevelRumatrix(image, ANGLES, chunk_pixels=chunk_pixels),
+                                  extractor.getGrayLevelRumatrix(image, ANGLES))
+
+
+@pytest.mark.parametrize('name', ['noise', 'odd size', 'smooth'])
+def test_striped_tamura_matches_whole_image(name):
+    image = tamura_images()[name]
+    width = image.shape[1]
+    # Stripes of max(70 - 2 * 32, 32) rows (the halo is 2**kmax) and of 5 rows
+    coarseness_budget = COARSENESS_BYTES_PER_PIXEL * width * 70
+    directionality_budget = DIRECTIONALITY_BYTES_PER_PIXEL * width * 7
+    assert len(row_tiles(image.shape, DIRECTIONALITY_BYTES_PER_PIXEL, directionality_budget, halo=1)) > 1
+
+    assert coarseness(image, 5, memory_budget=coarseness_budget) == coarseness(image, 5)
+    assert directionality(image, memory_budget=directionality_budget) == directionality(image)
+
+
+@pytest.fixture(scope='module')
+def untiled_features():
+    extractor = SingleImageFeatureExtractor()
+    return extractor.extract_features(segmented_image(), feature_names=list(extractor.feature_families))
+
+
+@pytest.mark.parametrize('memory_budget', [64 * 2**10, 2**20])
+def test_tiled_extraction_matches_untiled(untiled_features, memory_budget):
+    extractor = SingleImageFeatureExtractor(memory_budget=memory_budget)
+    features = extractor.extract_features(segmented_image(), feature_names=list(untiled_features.columns))
+
+    assert list(features.columns) == list(untiled_features.columns)
+    # Texture features count pixels and runs: identical. Color moments are
+    # merged from per-stripe sums: equal up to floating-point rounding.
+    texture = [name for name in features.columns
+               if extractor.feature_families[name] in extractor.texture_features]
+    np.testing.assert_array_equal(features[texture].to_numpy(), untiled_features[texture].to_numpy())
+    np.testing.assert_allclose(features.to_numpy(), untiled_features.to_numpy(), rtol=1e-9)